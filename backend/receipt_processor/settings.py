@@ -49,12 +49,75 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'receipt_processor.wsgi.application'
+ASGI_APPLICATION = 'receipt_processor.asgi.application'
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'receipts.db',
+# Async upload/analytics views (receipts.async_views), for ASGI servers.
+# PARSER_PROCESSES bounds the OCR/PDF process pool; ASYNC_MAX_CONCURRENCY
+# caps in-flight async requests, which wait up to ASYNC_QUEUE_TIMEOUT
+# seconds for a slot before getting 503.
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', 'False').lower() in ('1', 'true', 'yes')
+PARSER_PROCESSES = int(os.environ.get('PARSER_PROCESSES', str(os.cpu_count() or 2)))
+ASYNC_MAX_CONCURRENCY = int(os.environ.get('ASYNC_MAX_CONCURRENCY', '64'))
+ASYNC_QUEUE_TIMEOUT = float(os.environ.get('ASYNC_QUEUE_TIMEOUT', '5'))
+
+# Live dashboard event stream (receipts.events), served with ASYNC_VIEWS.
+# Changes are polled every SSE_POLL_INTERVAL seconds (sooner after local
+# writes); idle streams get a keepalive every SSE_HEARTBEAT_INTERVAL and are
+# closed after SSE_MAX_DURATION so the browser reconnects.
+SSE_POLL_INTERVAL = float(os.environ.get('SSE_POLL_INTERVAL', '1'))
+SSE_HEARTBEAT_INTERVAL = float(os.environ.get('SSE_HEARTBEAT_INTERVAL', '15'))
+SSE_MAX_DURATION = float(os.environ.get('SSE_MAX_DURATION', '300'))
+SSE_QUEUE_SIZE = int(os.environ.get('SSE_QUEUE_SIZE', '1000'))
+
+# Database
+# DB_ENGINE selects the backend ('sqlite' or 'postgres'). Connections are kept
+# open for DB_CONN_MAX_AGE seconds so requests reuse them instead of
+# reconnecting; set it to 0 to close after every request.
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite').lower()
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', '60'))
+
+if DB_ENGINE in ('postgres', 'postgresql'):
+    # Trigram lookups for fuzzy vendor search (pg_trgm)
+    INSTALLED_APPS.append('django.contrib.postgres')
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'receipts'),
+            'USER': os.environ.get('DB_USER', 'postgres'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            # Required when pooling through PgBouncer in transaction mode
+            'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('DB_POOLER', '').lower() == 'pgbouncer',
+            'OPTIONS': {
+                'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', '10')),
+            },
+        }
     }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'receipts.db'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'OPTIONS': {
+                # Seconds a writer waits for the lock before "database is locked"
+                'timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', '20')),
+            },
+        }
+    }
+
+# PRAGMAs applied to every new SQLite connection (see receipts.signals).
+# WAL lets dashboard reads run alongside upload writes.
+SQLITE_PRAGMAS = {
+    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', '20')) * 1000,
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+    'temp_store': 'MEMORY',
+    'foreign_keys': 'ON',
 }
 
 # Internationalization
@@ -78,6 +141,37 @@ CORS_ALLOWED_ORIGINS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Receipt previews (receipts.previews): longest edge in pixels per size,
+# stored in a content-addressed cache evicted LRU beyond the byte budget
+PREVIEW_ROOT = os.environ.get('PREVIEW_ROOT', os.path.join(BASE_DIR, 'previews'))
+PREVIEW_SIZES = {'thumb': 160, 'medium': 800}
+PREVIEW_QUALITY = 75
+PREVIEW_CACHE_MAX_BYTES = int(os.environ.get('PREVIEW_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+# Minimum seconds between eviction sweeps of PREVIEW_ROOT; the cache may
+# overshoot its budget by what is rendered in between
+PREVIEW_EVICTION_INTERVAL = float(os.environ.get('PREVIEW_EVICTION_INTERVAL', '60'))
+
+# Always stream uploads to a temporary file in chunks. Storage then moves
+# that file into MEDIA_ROOT instead of holding the upload in memory.
+# Put FILE_UPLOAD_TEMP_DIR on the same filesystem as MEDIA_ROOT so the move
+# is a rename.
+FILE_UPLOAD_HANDLERS = [
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+FILE_UPLOAD_TEMP_DIR = os.environ.get('FILE_UPLOAD_TEMP_DIR') or None
+
+# Days deleted-receipt tombstones are kept for the changes feed. Clients
+# with an older cursor get a full reset instead of a delta. Expired
+# tombstones are deleted by `manage.py prune_tombstones` (run it daily).
+TOMBSTONE_RETENTION_DAYS = int(os.environ.get('TOMBSTONE_RETENTION_DAYS', '30'))
+
+# Duplicate detection (receipts.duplicates): receipts with the same amount
+# and dates at most DUPLICATE_WINDOW_DAYS apart match if their vendors
+# normalize alike or their text SimHashes differ in at most
+# DUPLICATE_SIMHASH_DISTANCE of 64 bits.
+DUPLICATE_WINDOW_DAYS = int(os.environ.get('DUPLICATE_WINDOW_DAYS', '2'))
+DUPLICATE_SIMHASH_DISTANCE = int(os.environ.get('DUPLICATE_SIMHASH_DISTANCE', '16'))
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
@@ -0,0 +1,151 @@
+from datetime import date, timedelta
+
+from django.db.models import F
+
+from .models import Receipt, DailySketch, MonthlySketch
+from .utils.columnar import to_paise
+from .utils.sketches import VendorSketch, HyperLogLog, CountMinSketch, SpaceSaving, TDigest
+
+
+def sketch_from_row(row: DailySketch) -> VendorSketch:
+    frequencies = CountMinSketch(counters=bytes(row.vendor_frequencies))
+    frequencies.total = row.receipt_count
+    return VendorSketch(
+        hll=HyperLogLog(registers=bytes(row.vendor_hll)),
+        frequencies=frequencies,
+        top_spend=SpaceSaving(counters=row.vendor_top_spend),
+        amounts=TDigest(centroids=row.amount_digest),
+        receipt_count=row.receipt_count,
+        total_paise=row.total_paise,
+    )
+
+
+def _store(row, sketch: VendorSketch):
+    """Save a rebuilt sketch unless the row was invalidated meanwhile
+
+    The update only applies if ``version`` is unchanged, so a receipt
+    change that invalidated the period during the build leaves it stale
+    rather than persisting sketches computed from the old receipts.
+    """
+    fields = {
+        'receipt_count': sketch.receipt_count,
+        'total_paise': sketch.total_paise,
+        'vendor_hll': sketch.hll.to_bytes(),
+        'vendor_frequencies': sketch.frequencies.to_bytes(),
+        'vendor_top_spend': sketch.top_spend.to_dict(),
+        'amount_digest': sketch.amounts.to_list(),
+    }
+    type(row).objects.filter(pk=row.pk, version=row.version).update(stale=False, **fields)
+    for name, value in fields.items():
+        setattr(row, name, value)
+    return row
+
+
+def _merge_rows(result: VendorSketch, rows, build) -> None:
+    for row in rows:
+        if row.stale:
+            row = build(row)
+        result.merge(sketch_from_row(row))
+
+
+def _daily_rows(start_date=None, end_date=None):
+    rows = DailySketch.objects.all()
+    if start_date:
+        rows = rows.filter(day__gte=start_date)
+    if end_date:
+        rows = rows.filter(day__lte=end_date)
+    return rows
+
+
+def _next_month(day: date) -> date:
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def build_daily_sketch(row: DailySketch) -> DailySketch:
+    """Recompute a day's sketches from its receipts and store them"""
+    sketch = VendorSketch()
+    receipts = Receipt.objects.filter(transaction_date=row.day).values_list('vendor', 'amount')
+    for vendor, amount in receipts.iterator(chunk_size=2000):
+        sketch.add(vendor, to_paise(amount))
+    return _store(row, sketch)
+
+
+def build_monthly_sketch(row: MonthlySketch) -> MonthlySketch:
+    """Merge a month's daily sketches, rebuilding stale days, and store the result"""
+    sketch = VendorSketch()
+    last_day = _next_month(row.month) - timedelta(days=1)
+    _merge_rows(sketch, _daily_rows(row.month, last_day), build_daily_sketch)
+    return _store(row, sketch)
+
+
+def merged_sketch(start_date=None, end_date=None) -> VendorSketch:
+    """Merge the sketches in a date range, rebuilding stale rows one at a time
+
+    Whole calendar months come from the monthly rollups, so a long range
+    merges one row per month; only the partial months at either end are
+    merged day by day.
+    """
+    # First day of the first whole month, and the day after the last one
+    first = start_date if not start_date or start_date.day == 1 else _next_month(start_date)
+    after = _next_month(end_date) if end_date else None
+    if end_date and after - end_date > timedelta(days=1):
+        after = end_date.replace(day=1)
+
+    result = VendorSketch()
+    if first and after and first >= after:
+        _merge_rows(result, _daily_rows(start_date, end_date), build_daily_sketch)
+        return result
+
+    months = MonthlySketch.objects.all()
+    if first:
+        months = months.filter(month__gte=first)
+    if after:
+        months = months.filter(month__lt=after)
+    _merge_rows(result, months, build_monthly_sketch)
+    if start_date and start_date < first:
+        _merge_rows(result, _daily_rows(start_date, first - timedelta(days=1)), build_daily_sketch)
+    if end_date and after <= end_date:
+        _merge_rows(result, _daily_rows(after, end_date), build_daily_sketch)
+    return result
+
+
+def invalidate_days(*days):
+    """Mark the days' and their months' sketches stale, adding rows not seen before"""
+    days = {day for day in days if day is not None}
+    if days:
+        months = {day.replace(day=1) for day in days}
+        DailySketch.objects.filter(day__in=days).update(stale=True, version=F('version') + 1)
+        DailySketch.objects.bulk_create(
+            [DailySketch(day=day, stale=True) for day in days], ignore_conflicts=True
+        )
+        MonthlySketch.objects.filter(month__in=months).update(stale=True, version=F('version') + 1)
+        MonthlySketch.objects.bulk_create(
+            [MonthlySketch(month=month, stale=True) for month in months], ignore_conflicts=True
+        )
+
+
+# Filters only the exact path supports; approximate requests using them
+# fall back to exact analytics
+EXACT_ONLY_PARAMS = ('vendor', 'category', 'min_amount', 'max_amount', 'search')
+
+
+def approximate_analytics(params):
+    """Sketch-based analytics over a date range, with error bounds
+
+    Only start_date/end_date are supported; any other filter, or a
+    malformed date, returns None so the caller computes exact analytics.
+    """
+    if any(params.get(name) for name in EXACT_ONLY_PARAMS):
+        return None
+
+    try:
+        start_date = params.get('start_date')
+        end_date = params.get('end_date')
+        sketch = merged_sketch(
+            date.fromisoformat(start_date) if start_date else None,
+            date.fromisoformat(end_date) if end_date else None,
+        )
+    except ValueError:
+        return None
+
+    return {'approximate': True, **sketch.summary(10)}
@@ -0,0 +1,25 @@
+from django.apps import AppConfig
+
+
+class ReceiptsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'receipts'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+        from .signals import (
+            configure_sqlite_connection, record_receipt_deletion,
+            remember_previous_date, invalidate_daily_sketches, wake_event_stream,
+            index_duplicate_key, release_duplicates
+        )
+
+        connection_created.connect(configure_sqlite_connection)
+        post_delete.connect(record_receipt_deletion, sender='receipts.Receipt')
+        pre_save.connect(remember_previous_date, sender='receipts.Receipt')
+        post_save.connect(invalidate_daily_sketches, sender='receipts.Receipt')
+        post_delete.connect(invalidate_daily_sketches, sender='receipts.Receipt')
+        post_save.connect(wake_event_stream, sender='receipts.Receipt')
+        post_delete.connect(wake_event_stream, sender='receipts.Receipt')
+        post_save.connect(index_duplicate_key, sender='receipts.Receipt')
+        pre_delete.connect(release_duplicates, sender='receipts.Receipt')
@@ -0,0 +1,206 @@
+"""Async versions of the hot ``ReceiptViewSet`` actions for ASGI deployments
+
+Parsing runs in a bounded process pool, database access uses the async
+ORM, and a semaphore caps in-flight requests so a burst of uploads queues
+briefly and then gets 503 instead of exhausting the pool.
+"""
+import asyncio
+import json
+from functools import wraps
+from concurrent.futures import ProcessPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, HttpResponseNotAllowed, StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+from .approximate import approximate_analytics
+from .cache import get_receipt_table
+from .duplicates import find_duplicate
+from .events import receipt_events, with_absolute_urls
+from .filters import filter_receipts, table_filters
+from .models import Receipt
+from .serializers import ReceiptSerializer, ReceiptUploadSerializer
+from .storage import spool_upload, discard_upload, content_hash
+from .previews import warm_preview
+from .utils.algorithms import ReceiptAnalytics
+from .utils.columnar import ColumnarAnalytics
+from .utils.parsers import parse_stored_file
+from .utils.validators import ReceiptData, ValidationError
+
+_parser_pool = None
+_request_slots = None
+
+
+def get_parser_pool():
+    global _parser_pool
+    if _parser_pool is None:
+        _parser_pool = ProcessPoolExecutor(max_workers=settings.PARSER_PROCESSES)
+    return _parser_pool
+
+
+def get_request_slots():
+    global _request_slots
+    if _request_slots is None:
+        _request_slots = asyncio.Semaphore(settings.ASYNC_MAX_CONCURRENCY)
+    return _request_slots
+
+
+def json_response(data, status=200):
+    return JsonResponse(data, status=status, safe=False, encoder=JSONEncoder)
+
+
+def async_endpoint(method):
+    """Restrict an async view to one HTTP method and apply backpressure
+    
+    Django 4.2's view decorators return sync wrappers, which would hide the
+    coroutine from the handler, so method checks are done here instead.
+    The request holds a concurrency slot or gets 503 when saturated.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method != method:
+                return HttpResponseNotAllowed([method])
+            return await _with_slot(view, request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+async def _with_slot(view, request, *args, **kwargs):
+    slots = get_request_slots()
+    try:
+        await asyncio.wait_for(slots.acquire(), settings.ASYNC_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        response = json_response({'error': 'Server busy, retry shortly'}, status=503)
+        response['Retry-After'] = '1'
+        return response
+    try:
+        return await view(request, *args, **kwargs)
+    finally:
+        slots.release()
+
+
+@async_endpoint('POST')
+async def upload_receipt(request):
+    """Upload and process receipt"""
+    files = await sync_to_async(lambda: request.FILES)()
+    serializer = ReceiptUploadSerializer(data=files)
+    if not serializer.is_valid():
+        return json_response(serializer.errors, status=400)
+
+    stored_name = None
+    try:
+        stored_name, stored_path = await sync_to_async(spool_upload)(
+            serializer.validated_data['file']
+        )
+
+        loop = asyncio.get_running_loop()
+        parsed_data = await loop.run_in_executor(
+            get_parser_pool(), parse_stored_file, stored_path
+        )
+
+        receipt_data = ReceiptData(**parsed_data)
+        digest = await sync_to_async(content_hash)(stored_path)
+        duplicate_of = await sync_to_async(find_duplicate)(
+            receipt_data.vendor, receipt_data.amount,
+            receipt_data.transaction_date, receipt_data.raw_text
+        )
+        receipt = await Receipt.objects.acreate(
+            file=stored_name, content_hash=digest, duplicate_of_id=duplicate_of,
+            **receipt_data.dict()
+        )
+        await sync_to_async(warm_preview)(receipt)
+        return json_response(ReceiptSerializer(receipt).data, status=201)
+
+    except ValidationError as e:
+        if stored_name:
+            await sync_to_async(discard_upload)(stored_name)
+        return json_response({'error': str(e)}, status=400)
+    except Exception as e:
+        if stored_name:
+            await sync_to_async(discard_upload)(stored_name)
+        return json_response({'error': f'Processing failed: {str(e)}'}, status=500)
+
+
+# Matches the viewset, which DRF exempts from CSRF
+upload_receipt.csrf_exempt = True
+
+
+def compute_analytics(analytics, receipts):
+    return {
+        'statistics': analytics.compute_statistics(receipts),
+        'vendor_frequency': analytics.vendor_frequency_analysis(receipts),
+        'top_vendors': analytics.top_k_vendors(receipts, 10),
+        'category_distribution': analytics.category_distribution(receipts),
+        'time_series': analytics.time_series_analysis(receipts),
+    }
+
+
+@async_endpoint('GET')
+async def receipt_analytics(request):
+    """Get analytics and insights"""
+    if request.GET.get('approximate') == 'true':
+        data = await sync_to_async(approximate_analytics)(request.GET)
+        if data is not None:
+            return json_response(data)
+
+    filters = table_filters(request.GET)
+    if filters is not None:
+        table = await sync_to_async(get_receipt_table)()
+        analytics, receipts = ColumnarAnalytics(), table.filter(**filters)
+    else:
+        queryset = filter_receipts(Receipt.objects.all(), request.GET)
+        receipts = [
+            receipt async for receipt in queryset.values(
+                'vendor', 'transaction_date', 'amount', 'category'
+            )
+        ]
+        analytics = ReceiptAnalytics()
+
+    # The aggregations are CPU-bound; keep them off the event loop
+    loop = asyncio.get_running_loop()
+    data = await loop.run_in_executor(None, compute_analytics, analytics, receipts)
+    return json_response(data)
+
+
+def sse_message(event, data):
+    return f'event: {event}\ndata: {json.dumps(data, cls=JSONEncoder)}\n\n'
+
+
+async def stream_events(queue, snapshot, build_absolute_uri):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.SSE_MAX_DURATION
+    try:
+        yield 'retry: 3000\n' + sse_message('snapshot', snapshot)
+        while loop.time() < deadline:
+            try:
+                item = await asyncio.wait_for(queue.get(), settings.SSE_HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            if item is None:
+                break  # Fell behind; the client reconnects and resyncs
+            event, data = item
+            if event in ('receipt.created', 'receipt.updated'):
+                data = with_absolute_urls(data, build_absolute_uri)
+            yield sse_message(event, data)
+    finally:
+        receipt_events.unsubscribe(queue)
+
+
+async def receipt_event_stream(request):
+    """Server-sent events: a snapshot, then receipt changes and analytics deltas
+
+    Streams are long-lived, so they do not take a request slot.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    queue, snapshot = await receipt_events.subscribe()
+    response = StreamingHttpResponse(
+        stream_events(queue, snapshot, request.build_absolute_uri), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Stop nginx from buffering the stream
+    return response
@@ -0,0 +1,132 @@
+import threading
+from collections import Counter
+from datetime import timedelta
+
+from .models import Receipt, ReceiptTombstone
+from .utils.columnar import ReceiptTable
+from .utils.indexes import ReceiptIndex
+from .utils.trigrams import TrigramIndex
+
+TABLE_FIELDS = ('id', 'vendor', 'transaction_date', 'amount', 'category', 'updated_at')
+
+INDEX_LOOKUPS = ('amount_range', 'date_range', 'on_date', 'nearest_date')
+
+# Re-read a short window before the watermark: a transaction can commit
+# after a row with a newer updated_at has already been seen
+REFRESH_OVERLAP = timedelta(seconds=2)
+
+
+class ReceiptTableCache:
+    """Per-worker ``ReceiptTable`` and ``ReceiptIndex`` refreshed by ``updated_at``
+
+    Each refresh only loads rows updated since the last one, less a short
+    overlap (``REFRESH_OVERLAP``), and drops rows with a tombstone since
+    then. A remaining row-count mismatch (e.g. rows removed outside the ORM)
+    triggers a full reload.
+
+    It also keeps a trigram index and receipt counts over distinct vendor
+    names for fuzzy vendor suggestions.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._table = ReceiptTable()
+        self._index = ReceiptIndex()
+        self._vendor_index = TrigramIndex()
+        self._vendor_counts = Counter()
+        self._watermark = None
+
+    def _advance(self, record):
+        if self._watermark is None or record['updated_at'] > self._watermark:
+            self._watermark = record['updated_at']
+
+    def _reload(self):
+        records = list(Receipt.objects.values(*TABLE_FIELDS).iterator(chunk_size=2000))
+        self._table = ReceiptTable.from_records(records)
+        self._index = ReceiptIndex.from_records(records)
+        self._vendor_index = TrigramIndex()
+        self._vendor_counts = Counter(record['vendor'] for record in records)
+        for vendor in self._vendor_counts:
+            self._vendor_index.add(vendor)
+        self._watermark = None
+        for record in records:
+            self._advance(record)
+
+    def _upsert(self, record):
+        previous = self._table.vendor_of(record['id'])
+        if previous is not None:
+            self._vendor_counts[previous] -= 1
+        self._vendor_counts[record['vendor']] += 1
+        self._vendor_index.add(record['vendor'])
+        self._table.upsert(record)
+        self._index.insert(record)
+        self._advance(record)
+
+    def _remove(self, receipt_id):
+        previous = self._table.vendor_of(receipt_id)
+        if previous is not None:
+            self._vendor_counts[previous] -= 1
+        self._table.remove(receipt_id)
+        self._index.delete(receipt_id)
+
+    def refresh(self):
+        if self._watermark is not None:
+            since = self._watermark - REFRESH_OVERLAP
+            changed = Receipt.objects.filter(updated_at__gte=since)
+            for record in changed.values(*TABLE_FIELDS).iterator(chunk_size=2000):
+                self._upsert(record)
+            tombstones = ReceiptTombstone.objects.filter(deleted_at__gte=since)
+            for receipt_id in tombstones.values_list('receipt_id', flat=True):
+                self._remove(receipt_id)
+            if len(self._table) == Receipt.objects.count():
+                return
+
+        self._reload()
+
+    def invalidate(self):
+        with self._lock:
+            self.__init__()
+
+    def snapshot(self):
+        """Return an up-to-date copy of the table"""
+        with self._lock:
+            self.refresh()
+            return self._table.copy()
+
+    def lookup(self, method, *args):
+        """Run a ``ReceiptIndex`` lookup and return the matching records
+
+        The lookup runs under the lock on the live index, so only the
+        matching rows are copied out rather than the whole table and index.
+        """
+        if method not in INDEX_LOOKUPS:
+            raise ValueError(f'Unknown index lookup: {method}')
+        with self._lock:
+            self.refresh()
+            ids = getattr(self._index, method)(*args)
+            return self._table.records_for_ids(ids)
+
+    def suggest_vendors(self, query, limit=10):
+        """Ranked vendor names that still have receipts, with their counts"""
+        with self._lock:
+            self.refresh()
+            suggestions = []
+            for vendor, score in self._vendor_index.search(query, limit=limit * 5):
+                count = self._vendor_counts.get(vendor, 0)
+                if count > 0:
+                    suggestions.append({'vendor': vendor, 'score': score, 'receipt_count': count})
+                if len(suggestions) == limit:
+                    break
+            return suggestions
+
+
+receipt_table_cache = ReceiptTableCache()
+
+
+def get_receipt_table() -> ReceiptTable:
+    return receipt_table_cache.snapshot()
+
+
+def lookup_receipts(method, *args):
+    """Records matching an index lookup, e.g. ``lookup_receipts('on_date', day)``"""
+    return receipt_table_cache.lookup(method, *args)
@@ -0,0 +1,124 @@
+"""Near-duplicate receipt detection
+
+The same purchase often arrives twice, e.g. as an e-mailed PDF and a phone
+photo. Every receipt gets a ``DuplicateKey`` row: a blocking key of amount,
+date and normalized vendor, plus a SimHash of its text. Two receipts match
+when they have the same amount, dates at most DUPLICATE_WINDOW_DAYS apart
+and either the same normalized vendor or texts within
+DUPLICATE_SIMHASH_DISTANCE bits, which catches vendor names OCR misread.
+"""
+from collections import deque
+from datetime import timedelta
+from itertools import chain
+
+from django.conf import settings
+
+from .models import Receipt, DuplicateKey
+from .utils.columnar import to_paise
+from .utils.fingerprints import normalize_vendor, simhash, hamming
+
+KEY_FIELDS = ('receipt_id', 'vendor_key', 'amount_paise', 'day', 'simhash', 'receipt__created_at')
+
+
+def key_for(receipt):
+    return DuplicateKey(
+        receipt_id=receipt.pk,
+        vendor_key=normalize_vendor(receipt.vendor),
+        amount_paise=to_paise(receipt.amount),
+        day=receipt.transaction_date,
+        simhash=simhash(receipt.get_raw_text()),
+    )
+
+
+def index_receipt(receipt):
+    key = key_for(receipt)
+    DuplicateKey.objects.update_or_create(
+        receipt_id=key.receipt_id,
+        defaults={field: getattr(key, field) for field in ('vendor_key', 'amount_paise', 'day', 'simhash')},
+    )
+
+
+def index_receipts(receipts):
+    """Add keys for receipts created without save signals (bulk_create)"""
+    DuplicateKey.objects.bulk_create([key_for(receipt) for receipt in receipts], batch_size=500)
+
+
+def match_reason(vendor_key, fingerprint, other_vendor_key, other_fingerprint):
+    """Why two receipts with the same amount and close dates match, or None"""
+    if vendor_key and vendor_key == other_vendor_key:
+        return 'same_vendor'
+    if fingerprint and other_fingerprint and (
+        hamming(fingerprint, other_fingerprint) <= settings.DUPLICATE_SIMHASH_DISTANCE
+    ):
+        return 'similar_text'
+    return None
+
+
+def find_duplicate(vendor, amount, day, text, exclude=None, pending=()):
+    """ID of the existing receipt these details likely duplicate, or None
+
+    Prefers a same-vendor match, then the closest date, then the earliest
+    receipt; a match that is itself a duplicate resolves to its original.
+    ``pending`` holds ``(key, duplicate_of id)`` pairs for receipts not
+    saved yet, e.g. earlier ones in an ingest batch; they rank as newest.
+    """
+    window = timedelta(days=settings.DUPLICATE_WINDOW_DAYS)
+    vendor_key, fingerprint = normalize_vendor(vendor), simhash(text)
+    amount_paise = to_paise(amount)
+    candidates = DuplicateKey.objects.filter(
+        amount_paise=amount_paise, day__range=(day - window, day + window)
+    )
+    if exclude is not None:
+        candidates = candidates.exclude(receipt_id=exclude)
+
+    saved = (
+        (key['vendor_key'], key['simhash'], key['day'], (False, key['receipt__created_at']),
+         key['receipt__duplicate_of_id'] or key['receipt_id'])
+        for key in candidates.values(*KEY_FIELDS, 'receipt__duplicate_of_id')
+    )
+    unsaved = (
+        (key.vendor_key, key.simhash, key.day, (True, position), original or key.receipt_id)
+        for position, (key, original) in enumerate(pending)
+        if key.amount_paise == amount_paise and abs(key.day - day) <= window
+    )
+
+    best, best_rank = None, None
+    for other_vendor_key, other_fingerprint, other_day, age, original in chain(saved, unsaved):
+        reason = match_reason(vendor_key, fingerprint, other_vendor_key, other_fingerprint)
+        if reason is None:
+            continue
+        rank = (reason != 'same_vendor', abs((other_day - day).days)) + age
+        if best_rank is None or rank < best_rank:
+            best = original
+            best_rank = rank
+    return best
+
+
+def scan_duplicates(window_days=None):
+    """Yield (duplicate id, original id, reason) for every matching pair
+
+    Keys are streamed in (amount, day) order, so each one is only compared
+    with the keys of the same amount inside the date window before it.
+    """
+    window = timedelta(days=settings.DUPLICATE_WINDOW_DAYS if window_days is None else window_days)
+    recent = deque()
+    keys = DuplicateKey.objects.order_by('amount_paise', 'day').values(*KEY_FIELDS)
+    for key in keys.iterator(chunk_size=2000):
+        while recent and (
+            recent[0]['amount_paise'] != key['amount_paise'] or recent[0]['day'] < key['day'] - window
+        ):
+            recent.popleft()
+        for other in recent:
+            reason = match_reason(key['vendor_key'], key['simhash'], other['vendor_key'], other['simhash'])
+            if reason is None:
+                continue
+            if other['receipt__created_at'] <= key['receipt__created_at']:
+                yield key['receipt_id'], other['receipt_id'], reason
+            else:
+                yield other['receipt_id'], key['receipt_id'], reason
+        recent.append(key)
+
+
+def missing_keys():
+    """Receipts without a key, e.g. created before duplicate detection existed"""
+    return Receipt.objects.filter(duplicate_key__isnull=True)
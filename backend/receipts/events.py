@@ -0,0 +1,187 @@
+"""Live receipt events for the dashboard's server-sent event stream
+
+Each worker runs one poller over the changes feed (``updated_at`` plus
+tombstones), so writes made by any worker or by management commands are
+seen, and fans the events out to every connected stream. Analytics are
+kept as running totals, so each batch of changes yields the new totals
+and the sums of the categories and vendors it touched instead of a full
+recomputation. Deltas carry absolute values, so applying one twice is
+harmless.
+"""
+import asyncio
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Receipt, ReceiptTombstone
+from .serializers import ReceiptListSerializer
+from .utils.running_totals import RunningAnalytics
+
+# Re-read a short window before each cursor to catch late-committing writes
+POLL_OVERLAP = timedelta(seconds=2)
+
+# Vendors sent in a stream's snapshot, by spend; deltas carry any vendor
+SNAPSHOT_VENDORS = 10
+
+# Receipt payload fields holding URLs. The feed is shared by every stream,
+# so it serializes them relative and each stream makes them absolute for
+# its own request
+URL_FIELDS = ('file', 'preview_url')
+
+
+def with_absolute_urls(data, build_absolute_uri):
+    """Copy of a receipt payload with absolute URLs, as the REST API returns them"""
+    return {
+        name: build_absolute_uri(value) if name in URL_FIELDS and value else value
+        for name, value in data.items()
+    }
+
+
+class ReceiptEventFeed:
+    """Turns the changes feed into receipt and analytics events"""
+
+    def __init__(self):
+        self.totals = RunningAnalytics()
+        self._versions = {}
+        self._cursor = None
+        self._tombstone_cursor = None
+
+    def _prime(self):
+        self._tombstone_cursor = timezone.now()
+        receipts = Receipt.objects.values('id', 'vendor', 'category', 'amount', 'updated_at')
+        for record in receipts.iterator(chunk_size=2000):
+            self.totals.apply(record['id'], record)
+            self._versions[str(record['id'])] = record['updated_at']
+            if self._cursor is None or record['updated_at'] > self._cursor:
+                self._cursor = record['updated_at']
+        if self._cursor is None:
+            self._cursor = self._tombstone_cursor
+
+    def snapshot(self):
+        """Current totals for a newly connected stream"""
+        if self._tombstone_cursor is None:
+            self._prime()
+        return {
+            'statistics': self.totals.statistics(),
+            'categories': self.totals.category_sums(),
+            'vendors': self.totals.vendor_sums(self.totals.top_vendors(SNAPSHOT_VENDORS)),
+        }
+
+    def poll(self):
+        """Return ``(event, data)`` pairs for changes since the last poll"""
+        if self._tombstone_cursor is None:
+            self._prime()
+            return []
+
+        events = []
+        categories, vendors = set(), set()
+
+        def touch(*keys):
+            for key in keys:
+                if key is not None:
+                    vendors.add(key[0])
+                    categories.add(key[1])
+
+        changed = Receipt.objects.defer('raw_text').filter(updated_at__gte=self._cursor - POLL_OVERLAP)
+        for receipt in changed.order_by('updated_at'):
+            receipt_id = str(receipt.pk)
+            if self._versions.get(receipt_id) == receipt.updated_at:
+                continue
+            created = receipt_id not in self._versions
+            self._versions[receipt_id] = receipt.updated_at
+            self._cursor = max(self._cursor, receipt.updated_at)
+
+            previous, current = self.totals.apply(receipt_id, {
+                'vendor': receipt.vendor, 'category': receipt.category, 'amount': receipt.amount,
+            })
+            if previous != current:
+                touch(previous, current)
+            events.append((
+                'receipt.created' if created else 'receipt.updated',
+                ReceiptListSerializer(receipt).data
+            ))
+
+        tombstones = ReceiptTombstone.objects.filter(
+            deleted_at__gte=self._tombstone_cursor - POLL_OVERLAP
+        ).values_list('receipt_id', 'deleted_at')
+        for receipt_id, deleted_at in tombstones:
+            receipt_id = str(receipt_id)
+            self._tombstone_cursor = max(self._tombstone_cursor, deleted_at)
+            if self._versions.pop(receipt_id, None) is None:
+                continue
+            previous, _ = self.totals.apply(receipt_id, None)
+            touch(previous)
+            events.append(('receipt.deleted', {'id': receipt_id}))
+
+        if categories or vendors:
+            events.append(('analytics', {
+                'statistics': self.totals.statistics(),
+                'categories': self.totals.category_sums(categories),
+                'vendors': self.totals.vendor_sums(vendors),
+            }))
+        return events
+
+
+class ReceiptEventBroadcaster:
+    """Fans feed events out to per-stream queues while anyone is listening
+
+    A stream that falls ``SSE_QUEUE_SIZE`` events behind is sent ``None``
+    and closed; the browser reconnects and starts again from a snapshot.
+    """
+
+    def __init__(self, feed=None):
+        self.feed = feed or ReceiptEventFeed()
+        self._subscribers = set()
+        self._task = None
+        self._loop = None
+        self._wake = None
+
+    async def subscribe(self):
+        """Return (queue, snapshot) for a new stream"""
+        queue = asyncio.Queue(maxsize=settings.SSE_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        # Runs on the same thread as poll(), so the two never interleave
+        snapshot = await sync_to_async(self.feed.snapshot)()
+        return queue, snapshot
+
+    def unsubscribe(self, queue):
+        self._subscribers.discard(queue)
+
+    def wake(self):
+        """Poll now instead of at the next interval; safe from any thread"""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def _publish(self, events):
+        for queue in list(self._subscribers):
+            try:
+                for event in events:
+                    queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._subscribers.discard(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+    async def _run(self):
+        while self._subscribers:
+            try:
+                events = await sync_to_async(self.feed.poll)()
+            except Exception:
+                events = []  # Database hiccup; retry on the next tick
+            if events:
+                self._publish(events)
+            try:
+                await asyncio.wait_for(self._wake.wait(), settings.SSE_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+
+receipt_events = ReceiptEventBroadcaster()
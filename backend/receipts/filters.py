@@ -0,0 +1,69 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db.models import Q
+
+from .models import ReceiptText
+
+
+def filter_receipts(queryset, params):
+    """Apply the list query parameters (filters and sort_by) to a queryset"""
+    vendor = params.get('vendor')
+    category = params.get('category')
+    min_amount = params.get('min_amount')
+    max_amount = params.get('max_amount')
+    start_date = params.get('start_date')
+    end_date = params.get('end_date')
+    search = params.get('search')
+    
+    if vendor:
+        queryset = queryset.filter(vendor__icontains=vendor)
+    if category:
+        queryset = queryset.filter(category=category)
+    if min_amount:
+        queryset = queryset.filter(amount__gte=min_amount)
+    if max_amount:
+        queryset = queryset.filter(amount__lte=max_amount)
+    if start_date:
+        queryset = queryset.filter(transaction_date__gte=start_date)
+    if end_date:
+        queryset = queryset.filter(transaction_date__lte=end_date)
+    if search:
+        matches = Q(vendor__icontains=search) | Q(raw_text__icontains=search)
+        if params.get('include_archived') == 'true':
+            # Archived text is compressed, so matching it decompresses every
+            # archived receipt in the queryset; only done when asked for
+            needle = search.lower()
+            archived = [
+                receipt_id for receipt_id, text in ReceiptText.texts_for(queryset)
+                if needle in text.lower()
+            ]
+            matches |= Q(pk__in=archived)
+        queryset = queryset.filter(matches)
+    
+    # Apply sorting
+    sort_by = params.get('sort_by', '-transaction_date')
+    return queryset.order_by(sort_by)
+
+
+def table_filters(params):
+    """Translate the list query parameters into ``ReceiptTable.filter`` kwargs
+    
+    Text filters (vendor, search) need the database, so None is returned
+    and the caller falls back to the queryset.
+    """
+    if params.get('vendor') or params.get('search'):
+        return None
+    
+    try:
+        start_date = params.get('start_date')
+        end_date = params.get('end_date')
+        return {
+            'category': params.get('category') or None,
+            'min_amount': Decimal(params['min_amount']) if params.get('min_amount') else None,
+            'max_amount': Decimal(params['max_amount']) if params.get('max_amount') else None,
+            'start_date': date.fromisoformat(start_date) if start_date else None,
+            'end_date': date.fromisoformat(end_date) if end_date else None,
+        }
+    except (ValueError, ArithmeticError):
+        return None
@@ -0,0 +1,90 @@
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from receipts.models import Receipt, ReceiptText, CompressionDictionary
+from receipts.utils.compression import available_codecs, compress_text, train_dictionary
+
+
+class Command(BaseCommand):
+    help = 'Move the raw_text of old receipts into compressed cold storage'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-months', type=int, default=12,
+                            help='Archive receipts with a transaction date older than this')
+        parser.add_argument('--codec', choices=['zlib', 'zstd'], default='zlib')
+        parser.add_argument('--train-dictionary', action='store_true',
+                            help='Train a shared dictionary on the receipts being archived')
+        parser.add_argument('--sample-size', type=int, default=500,
+                            help='Number of receipts used to train the dictionary')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--vacuum', action='store_true',
+                            help='VACUUM SQLite afterwards to return freed pages to the OS')
+
+    def handle(self, *args, **options):
+        codec = options['codec']
+        if codec not in available_codecs():
+            raise CommandError(f'Codec {codec} is unavailable; install zstandard')
+
+        cutoff = date.today() - relativedelta(months=options['older_than_months'])
+        candidates = (
+            Receipt.objects
+            .filter(transaction_date__lt=cutoff, raw_text_archived=False)
+            .exclude(raw_text='')
+        )
+
+        dictionary = None
+        if options['train_dictionary']:
+            samples = list(candidates.values_list('raw_text', flat=True)[:options['sample_size']])
+            data = train_dictionary(samples, codec) if samples else b''
+            if data:
+                dictionary = CompressionDictionary.objects.create(codec=codec, data=data)
+                self.stdout.write(f'Trained {len(data)} byte {codec} dictionary on {len(samples)} receipts')
+
+        zdict = bytes(dictionary.data) if dictionary else None
+        now = timezone.now()
+        archived = original_bytes = stored_bytes = 0
+
+        while True:
+            # Archived rows drop out of the filter, so always take the first batch
+            batch = list(candidates.only('id', 'raw_text')[:options['batch_size']])
+            if not batch:
+                break
+
+            cold = []
+            for receipt in batch:
+                data = compress_text(receipt.raw_text, codec, zdict)
+                size = len(receipt.raw_text.encode('utf-8'))
+                cold.append(ReceiptText(
+                    receipt=receipt, codec=codec, dictionary=dictionary,
+                    data=data, original_size=size
+                ))
+                original_bytes += size
+                stored_bytes += len(data)
+                receipt.raw_text = ''
+                receipt.raw_text_archived = True
+                receipt.updated_at = now
+
+            with transaction.atomic():
+                ReceiptText.objects.bulk_create(cold)
+                # Bump updated_at so the changes feed and table caches see the row change
+                Receipt.objects.bulk_update(batch, ['raw_text', 'raw_text_archived', 'updated_at'])
+            archived += len(batch)
+
+        if not archived:
+            self.stdout.write('Nothing to archive')
+            return
+
+        ratio = original_bytes / stored_bytes if stored_bytes else 0
+        self.stdout.write(
+            f'Archived {archived} receipts: {original_bytes} -> {stored_bytes} bytes ({ratio:.1f}x)'
+        )
+
+        if options['vacuum'] and connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('VACUUM')
+            self.stdout.write('Database vacuumed')
+        self.stdout.write(self.style.SUCCESS('Archive complete'))
@@ -0,0 +1,78 @@
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from receipts.duplicates import index_receipts, missing_keys, scan_duplicates
+from receipts.models import Receipt
+
+
+class Command(BaseCommand):
+    help = 'Find likely duplicate receipts among existing data and optionally flag them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--window-days', type=int, default=settings.DUPLICATE_WINDOW_DAYS,
+                            help='Maximum days between the dates of two duplicates')
+        parser.add_argument('--flag', action='store_true',
+                            help='Set duplicate_of on each duplicate to its original')
+        parser.add_argument('--show', type=int, default=20,
+                            help='Number of duplicate pairs to print')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        indexed = 0
+        while True:
+            # Indexed receipts drop out of the filter, so always take the first batch
+            batch = list(missing_keys()[:options['batch_size']])
+            if not batch:
+                break
+            index_receipts(batch)
+            indexed += len(batch)
+        if indexed:
+            self.stdout.write(f'Indexed {indexed} receipts')
+
+        originals = {}
+        reasons = Counter()
+        pairs = 0
+        for duplicate_id, original_id, reason in scan_duplicates(options['window_days']):
+            pairs += 1
+            reasons[reason] += 1
+            if pairs <= options['show']:
+                self.stdout.write(f'  {duplicate_id} duplicates {original_id} ({reason})')
+            originals.setdefault(duplicate_id, original_id)
+
+        self.stdout.write(
+            f'{pairs} matching pairs, {len(originals)} likely duplicates '
+            f'({", ".join(f"{reason}: {count}" for reason, count in reasons.items()) or "none"})'
+        )
+
+        if options['flag'] and originals:
+            flagged = self.flag(originals)
+            self.stdout.write(f'Flagged {flagged} receipts')
+        self.stdout.write(self.style.SUCCESS('Duplicate scan complete'))
+
+    def flag(self, originals):
+        def root(receipt_id):
+            seen = {receipt_id}
+            while receipt_id in originals and originals[receipt_id] not in seen:
+                receipt_id = originals[receipt_id]
+                seen.add(receipt_id)
+            return receipt_id
+
+        now = timezone.now()
+        duplicate_ids = list(originals)
+        flagged = 0
+        for start in range(0, len(duplicate_ids), 500):
+            changed = []
+            receipts = Receipt.objects.filter(pk__in=duplicate_ids[start:start + 500])
+            for receipt in receipts.only('id', 'duplicate_of'):
+                original = root(receipt.pk)
+                if original != receipt.pk and receipt.duplicate_of_id != original:
+                    receipt.duplicate_of_id = original
+                    # Bump updated_at so the changes feed carries the new flag
+                    receipt.updated_at = now
+                    changed.append(receipt)
+            Receipt.objects.bulk_update(changed, ['duplicate_of', 'updated_at'])
+            flagged += len(changed)
+        return flagged
@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Modules that must only be imported on demand (see utils.extractors.load_backend)
+LAZY_MODULES = ('PyPDF2', 'PIL', 'pytesseract', 'numpy')
+
+STARTUP_SCRIPT = 'import django; django.setup(); import receipt_processor.urls'
+
+
+class Command(BaseCommand):
+    help = 'Measure cold-start import time of a web worker and enforce a budget'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--budget-ms', type=float, default=750.0,
+                            help='Fail if total import time exceeds this many milliseconds')
+        parser.add_argument('--top', type=int, default=10,
+                            help='Number of slowest top-level imports to report')
+
+    def handle(self, *args, **options):
+        env = dict(os.environ)
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'receipt_processor.settings')
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+            capture_output=True, text=True, env=env
+        )
+        if result.returncode != 0:
+            raise CommandError(f'Startup failed:\n{result.stderr[-2000:]}')
+
+        total_us = 0
+        top_level = []
+        loaded = set()
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            total_us += int(self_us)
+            module = name.strip()
+            loaded.add(module.split('.')[0])
+            # Top-level imports are not indented beyond the single leading space
+            if not name.startswith('  '):
+                top_level.append((int(cumulative_us), module))
+
+        total_ms = total_us / 1000
+        self.stdout.write(f'Total import time: {total_ms:.1f} ms (budget {options["budget_ms"]:.0f} ms)')
+        for cumulative_us, module in sorted(top_level, reverse=True)[:options['top']]:
+            self.stdout.write(f'  {cumulative_us / 1000:8.1f} ms  {module}')
+
+        eager = sorted(loaded.intersection(LAZY_MODULES))
+        if eager:
+            raise CommandError(f'Heavy modules imported at startup: {", ".join(eager)}')
+        if total_ms > options['budget_ms']:
+            raise CommandError(f'Import time {total_ms:.1f} ms exceeds budget')
+        self.stdout.write(self.style.SUCCESS('Import budget OK'))
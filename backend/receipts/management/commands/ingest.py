@@ -0,0 +1,258 @@
+import hashlib
+import mailbox
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from receipts.approximate import invalidate_days
+from receipts.duplicates import find_duplicate, index_receipts, key_for
+from receipts.models import Receipt, RejectedFile
+from receipts.storage import spool_upload, discard_upload, content_hash
+from receipts.utils.extractors import IMAGE_EXTENSIONS
+from receipts.utils.parsers import parse_stored_file
+from receipts.utils.validators import ReceiptData, ValidationError
+
+SUPPORTED_EXTENSIONS = IMAGE_EXTENSIONS + ('pdf', 'txt')
+
+# Files changed this recently may still be being written; watch mode
+# picks them up on a later poll
+SETTLE_SECONDS = 2
+
+
+def is_supported(name):
+    return name.lower().rsplit('.', 1)[-1] in SUPPORTED_EXTENSIONS
+
+
+def open_receipt_file(path):
+    return File(open(path, 'rb'), name=os.path.basename(path))
+
+
+class DirectorySource:
+    """Receipt files under a directory tree as (opener, content hash) pairs"""
+
+    def __init__(self, root):
+        self.root = root
+        # (path, size, mtime) of the files yielded by new_items so far
+        self.seen = set()
+
+    def files(self):
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in sorted(filenames):
+                if not is_supported(filename):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    yield path, os.stat(path)
+                except FileNotFoundError:
+                    continue
+
+    def items(self):
+        for path, _ in self.files():
+            yield partial(open_receipt_file, path), content_hash(path)
+
+    def new_items(self, changed_before):
+        """Files not yielded by an earlier call, once unchanged since ``changed_before``
+
+        Files are told apart by (path, size, mtime) rather than by an mtime
+        window: mv, cp -p and rsync -t bring files in with old mtimes. The
+        inode change time still moves, so it is what tells a settled file.
+        """
+        present = set()
+        for path, stat in self.files():
+            if max(stat.st_mtime, stat.st_ctime) >= changed_before:
+                continue
+            key = (path, stat.st_size, stat.st_mtime)
+            present.add(key)
+            if key not in self.seen:
+                yield partial(open_receipt_file, path), content_hash(path)
+        # Forget removed files, so the set stays the size of the directory
+        self.seen = present
+
+
+class MailboxSource:
+    """Receipt attachments of the messages in an mbox file, read message by message"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def items(self):
+        for message in mailbox.mbox(self.path, create=False):
+            for part in message.walk():
+                filename = part.get_filename()
+                if not filename or not is_supported(filename):
+                    continue
+                data = part.get_payload(decode=True)
+                if not data:
+                    continue
+                yield partial(ContentFile, data, name=filename), hashlib.sha256(data).hexdigest()
+
+
+def batches(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Command(BaseCommand):
+    help = 'Bulk-ingest receipt files from a directory tree or an mbox file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help='Directory of receipt files, or an mbox file')
+        parser.add_argument('--workers', type=int, default=settings.PARSER_PROCESSES,
+                            help='Parser processes')
+        parser.add_argument('--batch-size', type=int, default=200,
+                            help='Receipts parsed and inserted per transaction')
+        parser.add_argument('--watch', action='store_true',
+                            help='Keep polling the directory for new files')
+        parser.add_argument('--interval', type=float, default=10.0,
+                            help='Seconds between polls in watch mode')
+        parser.add_argument('--retry-rejected', action='store_true',
+                            help='Parse files rejected by earlier runs again (e.g. after installing OCR)')
+
+    def handle(self, *args, **options):
+        source = options['source']
+        if os.path.isdir(source):
+            source = DirectorySource(source)
+        elif os.path.isfile(source):
+            if options['watch']:
+                raise CommandError('--watch needs a directory')
+            source = MailboxSource(source)
+        else:
+            raise CommandError(f'No such file or directory: {source}')
+
+        self.retry_rejected = options['retry_rejected']
+        self.stats = Counter()
+        self.stages = Counter()
+        self.started = time.monotonic()
+
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            try:
+                if not options['watch']:
+                    self.ingest(source.items(), pool, options['batch_size'])
+                else:
+                    self.watch(source, pool, options)
+            except KeyboardInterrupt:
+                self.stdout.write('Interrupted')
+
+        self.report()
+
+    def watch(self, source, pool, options):
+        self.stdout.write(f'Watching {source.root} every {options["interval"]:.0f}s (Ctrl-C to stop)')
+        while True:
+            self.ingest(source.new_items(time.time() - SETTLE_SECONDS), pool, options['batch_size'])
+            time.sleep(options['interval'])
+
+    def ingest(self, items, pool, batch_size):
+        seen = set()
+        for batch in batches(items, batch_size):
+            self.stats['scanned'] += len(batch)
+            digests = [digest for _, digest in batch]
+            existing = set(
+                Receipt.objects.filter(content_hash__in=digests).values_list('content_hash', flat=True)
+            )
+            rejected = set()
+            if not self.retry_rejected:
+                rejected = set(
+                    RejectedFile.objects.filter(content_hash__in=digests).values_list('content_hash', flat=True)
+                )
+
+            stored = []
+            for opener, digest in batch:
+                if digest in existing or digest in seen:
+                    self.stats['duplicates'] += 1
+                    continue
+                seen.add(digest)
+                if digest in rejected:
+                    self.stats['skipped'] += 1
+                    continue
+                upload = opener()
+                try:
+                    stored_name, stored_path = spool_upload(upload)
+                finally:
+                    upload.close()
+                self.stats['bytes'] += os.path.getsize(stored_path)
+                stored.append((stored_name, stored_path, digest, upload.name))
+
+            if stored:
+                results = pool.map(parse_stored_file, [path for _, path, _, _ in stored])
+                self.save(stored, results)
+
+            elapsed = max(time.monotonic() - self.started, 1e-6)
+            self.stdout.write(
+                f'{self.stats["scanned"]} scanned, {self.stats["ingested"]} ingested, '
+                f'{self.stats["duplicates"]} duplicates, {self.stats["failed"]} failed, '
+                f'{self.stats["skipped"]} previously rejected ({self.stats["scanned"] / elapsed:.1f} files/s)'
+            )
+
+    def save(self, stored, results):
+        receipts, rejected = [], []
+        # Keys of this batch's receipts, so duplicates within it are caught too
+        pending = []
+        for (stored_name, _, digest, name), parsed in zip(stored, results):
+            try:
+                receipt_data = ReceiptData(**parsed)
+            except ValidationError as e:
+                rejected.append((stored_name, RejectedFile(
+                    content_hash=digest, name=os.path.basename(name)[:255], reason=str(e)
+                )))
+                continue
+            duplicate_of = find_duplicate(
+                receipt_data.vendor, receipt_data.amount,
+                receipt_data.transaction_date, receipt_data.raw_text,
+                pending=pending
+            )
+            receipt = Receipt(
+                file=stored_name, content_hash=digest, duplicate_of_id=duplicate_of,
+                **receipt_data.dict()
+            )
+            receipts.append(receipt)
+            pending.append((key_for(receipt), duplicate_of))
+            self.stages[receipt_data.extraction_stage] += 1
+
+        with transaction.atomic():
+            Receipt.objects.bulk_create(receipts)
+            # bulk_create skips save signals: index the receipts for
+            # duplicate detection and refresh the affected sketches here
+            index_receipts(receipts)
+            # Remember rejected files so later runs skip them without parsing
+            RejectedFile.objects.bulk_create(
+                [rejection for _, rejection in rejected], update_conflicts=True,
+                unique_fields=['content_hash'], update_fields=['name', 'reason', 'rejected_at']
+            )
+            if self.retry_rejected:
+                RejectedFile.objects.filter(
+                    content_hash__in=[receipt.content_hash for receipt in receipts]
+                ).delete()
+        invalidate_days(*{receipt.transaction_date for receipt in receipts})
+
+        for stored_name, _ in rejected:
+            discard_upload(stored_name)
+        self.stats['ingested'] += len(receipts)
+        self.stats['failed'] += len(rejected)
+
+    def report(self):
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        megabytes = self.stats['bytes'] / (1024 * 1024)
+        self.stdout.write(
+            f'Ingested {self.stats["ingested"]} of {self.stats["scanned"]} files in {elapsed:.1f}s: '
+            f'{self.stats["ingested"] / elapsed:.1f} receipts/s, {megabytes / elapsed:.2f} MB/s; '
+            f'{self.stats["duplicates"]} duplicates, {self.stats["failed"]} failed, '
+            f'{self.stats["skipped"]} previously rejected'
+        )
+        if self.stages:
+            stages = ', '.join(f'{stage or "none"}: {count}' for stage, count in self.stages.most_common())
+            self.stdout.write(f'Extraction stages: {stages}')
+        self.stdout.write(self.style.SUCCESS('Ingest complete'))
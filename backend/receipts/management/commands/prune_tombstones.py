@@ -0,0 +1,20 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from receipts.models import ReceiptTombstone
+
+
+class Command(BaseCommand):
+    help = 'Delete deleted-receipt tombstones older than the changes feed retention'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.TOMBSTONE_RETENTION_DAYS,
+                            help='Keep tombstones from this many most recent days')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        deleted, _ = ReceiptTombstone.objects.filter(deleted_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f'Pruned {deleted} tombstones older than {cutoff:%Y-%m-%d %H:%M}'))
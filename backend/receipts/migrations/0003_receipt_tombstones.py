@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("receipts", "0002_update_for_inr"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReceiptTombstone",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("receipt_id", models.UUIDField(db_index=True)),
+                ("deleted_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                "ordering": ["deleted_at"],
+            },
+        ),
+        migrations.AlterField(
+            model_name="receipt",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("receipts", "0003_receipt_tombstones"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailySketch",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("day", models.DateField(unique=True)),
+                ("receipt_count", models.PositiveIntegerField(default=0)),
+                ("total_paise", models.BigIntegerField(default=0)),
+                ("vendor_hll", models.BinaryField()),
+                ("vendor_frequencies", models.BinaryField()),
+                ("vendor_top_spend", models.JSONField(default=dict)),
+                ("amount_digest", models.JSONField(default=list)),
+            ],
+            options={
+                "ordering": ["day"],
+            },
+        ),
+    ]
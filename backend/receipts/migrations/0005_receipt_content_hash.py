@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("receipts", "0004_daily_sketches"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="receipt",
+            name="content_hash",
+            field=models.CharField(blank=True, db_index=True, help_text="SHA-256 of the uploaded file", max_length=64),
+        ),
+    ]
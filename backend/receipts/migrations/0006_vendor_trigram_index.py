@@ -0,0 +1,35 @@
+from django.db import migrations
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # pg_trgm only exists on Postgres; SQLite uses the in-process index
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS receipts_receipt_vendor_trgm "
+        "ON receipts_receipt USING gin (vendor gin_trgm_ops)"
+    )
+    # Serves the vendor__icontains filter, which compares UPPER(vendor)
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS receipts_receipt_vendor_upper_trgm "
+        "ON receipts_receipt USING gin (UPPER(vendor) gin_trgm_ops)"
+    )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS receipts_receipt_vendor_upper_trgm")
+    schema_editor.execute("DROP INDEX IF EXISTS receipts_receipt_vendor_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("receipts", "0005_receipt_content_hash"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("receipts", "0006_vendor_trigram_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CompressionDictionary",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("codec", models.CharField(max_length=10)),
+                ("data", models.BinaryField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="receipt",
+            name="raw_text_archived",
+            field=models.BooleanField(default=False, help_text="raw_text has been moved, compressed, to ReceiptText"),
+        ),
+        migrations.CreateModel(
+            name="ReceiptText",
+            fields=[
+                ("receipt", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name="cold_text", serialize=False, to="receipts.receipt")),
+                ("codec", models.CharField(max_length=10)),
+                ("data", models.BinaryField()),
+                ("original_size", models.PositiveIntegerField(default=0)),
+                ("dictionary", models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, to="receipts.compressiondictionary")),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("receipts", "0007_receipt_cold_storage"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="receipt",
+            name="extraction_stage",
+            field=models.CharField(blank=True, help_text="Extractor that produced raw_text, e.g. text_layer or ocr_low", max_length=20),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("receipts", "0008_receipt_extraction_stage"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="receipt",
+            name="duplicate_of",
+            field=models.ForeignKey(blank=True, help_text="Earlier receipt this one likely duplicates", null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="duplicates", to="receipts.receipt"),
+        ),
+        migrations.CreateModel(
+            name="DuplicateKey",
+            fields=[
+                ("receipt", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name="duplicate_key", serialize=False, to="receipts.receipt")),
+                ("vendor_key", models.CharField(max_length=200)),
+                ("amount_paise", models.BigIntegerField()),
+                ("day", models.DateField()),
+                ("simhash", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "indexes": [models.Index(fields=["amount_paise", "day", "vendor_key"], name="receipts_du_amount__286097_idx")],
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+from django.db import migrations, models
+
+
+def add_missing_days(apps, schema_editor):
+    # Every date with receipts needs a row; new ones start stale
+    Receipt = apps.get_model("receipts", "Receipt")
+    DailySketch = apps.get_model("receipts", "DailySketch")
+    days = Receipt.objects.order_by().values_list("transaction_date", flat=True).distinct()
+    DailySketch.objects.bulk_create(
+        [DailySketch(day=day, stale=True) for day in days],
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("receipts", "0009_duplicate_detection"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dailysketch",
+            name="stale",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="dailysketch",
+            name="version",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="dailysketch",
+            name="vendor_frequencies",
+            field=models.BinaryField(default=bytes),
+        ),
+        migrations.AlterField(
+            model_name="dailysketch",
+            name="vendor_hll",
+            field=models.BinaryField(default=bytes),
+        ),
+        migrations.RunPython(add_missing_days, migrations.RunPython.noop),
+    ]
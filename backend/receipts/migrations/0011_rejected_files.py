@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("receipts", "0010_daily_sketch_versions"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RejectedFile",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("content_hash", models.CharField(max_length=64, unique=True)),
+                ("name", models.CharField(max_length=255)),
+                ("reason", models.TextField(blank=True)),
+                ("rejected_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:33
+
+from django.db import migrations, models
+
+
+def add_months(apps, schema_editor):
+    # Every month with a daily sketch needs a row; new ones start stale
+    DailySketch = apps.get_model("receipts", "DailySketch")
+    MonthlySketch = apps.get_model("receipts", "MonthlySketch")
+    months = {day.replace(day=1) for day in DailySketch.objects.values_list("day", flat=True)}
+    MonthlySketch.objects.bulk_create(
+        [MonthlySketch(month=month, stale=True) for month in months],
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("receipts", "0011_rejected_files"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MonthlySketch",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("stale", models.BooleanField(default=False)),
+                ("version", models.PositiveIntegerField(default=0)),
+                ("receipt_count", models.PositiveIntegerField(default=0)),
+                ("total_paise", models.BigIntegerField(default=0)),
+                ("vendor_hll", models.BinaryField(default=bytes)),
+                ("vendor_frequencies", models.BinaryField(default=bytes)),
+                ("vendor_top_spend", models.JSONField(default=dict)),
+                ("amount_digest", models.JSONField(default=list)),
+                ("month", models.DateField(unique=True)),
+            ],
+            options={
+                "ordering": ["month"],
+            },
+        ),
+        migrations.RunPython(add_months, migrations.RunPython.noop),
+    ]
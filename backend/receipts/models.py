@@ -15,6 +15,12 @@ class Receipt(models.Model):
     
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     file = models.FileField(upload_to='receipts/')
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        db_index=True,
+        help_text="SHA-256 of the uploaded file"
+    )
     vendor = models.CharField(max_length=200, db_index=True)
     transaction_date = models.DateField(db_index=True)
     amount = models.DecimalField(
@@ -26,9 +32,26 @@ class Receipt(models.Model):
     )
     category = models.CharField(max_length=50, choices=CATEGORY_CHOICES, default='other')
     raw_text = models.TextField(blank=True)
+    raw_text_archived = models.BooleanField(
+        default=False,
+        help_text="raw_text has been moved, compressed, to ReceiptText"
+    )
     confidence_score = models.FloatField(default=0.0)
+    extraction_stage = models.CharField(
+        max_length=20,
+        blank=True,
+        help_text="Extractor that produced raw_text, e.g. text_layer or ocr_low"
+    )
+    duplicate_of = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='duplicates',
+        help_text="Earlier receipt this one likely duplicates"
+    )
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         indexes = [
@@ -47,8 +70,160 @@ class Receipt(models.Model):
         """Return formatted amount in Indian currency format"""
         return f"₹{self.amount:,.2f}"
     
+    def get_raw_text(self):
+        """OCR text, decompressed from cold storage if it has been archived"""
+        if self.raw_text_archived:
+            return self.cold_text.decompress()
+        return self.raw_text
+    
     @property
     def amount_in_words(self):
         """Convert amount to words (optional feature)"""
         # This could be expanded to convert numbers to Indian words
-        return f"Rupees {self.amount}"
\ No newline at end of file
+        return f"Rupees {self.amount}"
+
+class CompressionDictionary(models.Model):
+    """Shared dictionary trained on sample receipts for better compression"""
+    codec = models.CharField(max_length=10)
+    data = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.codec} dictionary {self.pk} ({len(self.data)} bytes)"
+
+class ReceiptText(models.Model):
+    """Compressed cold storage for the raw_text of archived receipts"""
+    receipt = models.OneToOneField(
+        Receipt,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='cold_text'
+    )
+    codec = models.CharField(max_length=10)
+    dictionary = models.ForeignKey(
+        CompressionDictionary,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True
+    )
+    data = models.BinaryField()
+    original_size = models.PositiveIntegerField(default=0)
+    
+    def decompress(self):
+        from .utils.compression import decompress_text
+        dictionary = bytes(self.dictionary.data) if self.dictionary_id else None
+        return decompress_text(bytes(self.data), self.codec, dictionary)
+    
+    @classmethod
+    def texts_for(cls, receipts):
+        """Yield (receipt id, raw_text) for the archived receipts in a queryset
+        
+        Text searches use this to cover cold storage. Each shared dictionary
+        is loaded once rather than once per receipt.
+        """
+        from .utils.compression import decompress_text
+        archived = receipts.filter(raw_text_archived=True).values('pk')
+        dictionaries = {}
+        for text in cls.objects.filter(receipt__in=archived).iterator(chunk_size=500):
+            if text.dictionary_id and text.dictionary_id not in dictionaries:
+                dictionaries[text.dictionary_id] = bytes(text.dictionary.data)
+            yield text.receipt_id, decompress_text(
+                bytes(text.data), text.codec, dictionaries.get(text.dictionary_id)
+            )
+    
+    def __str__(self):
+        return f"Text of {self.receipt_id} ({self.codec}, {len(self.data)} bytes)"
+
+class ReceiptTombstone(models.Model):
+    """Record of a deleted receipt, so incremental sync clients can drop it"""
+    receipt_id = models.UUIDField(db_index=True)
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    class Meta:
+        ordering = ['deleted_at']
+    
+    def __str__(self):
+        return f"{self.receipt_id} deleted at {self.deleted_at}"
+
+class SketchRollup(models.Model):
+    """Serialized ``VendorSketch`` for a period, with staleness tracking"""
+    stale = models.BooleanField(default=False)
+    version = models.PositiveIntegerField(default=0)
+    receipt_count = models.PositiveIntegerField(default=0)
+    total_paise = models.BigIntegerField(default=0)
+    vendor_hll = models.BinaryField(default=bytes)
+    vendor_frequencies = models.BinaryField(default=bytes)
+    vendor_top_spend = models.JSONField(default=dict)
+    amount_digest = models.JSONField(default=list)
+    
+    class Meta:
+        abstract = True
+
+class DailySketch(SketchRollup):
+    """Mergeable analytics sketches for all receipts on one transaction date
+    
+    Every date with receipts has a row. A receipt change on the date marks
+    it stale and bumps ``version``; stale rows are rebuilt on demand, and a
+    rebuild is only stored if the version did not move meanwhile (see
+    ``receipts.approximate``).
+    """
+    day = models.DateField(unique=True)
+    
+    class Meta:
+        ordering = ['day']
+    
+    def __str__(self):
+        return f"Sketch for {self.day} ({self.receipt_count} receipts)"
+
+class MonthlySketch(SketchRollup):
+    """The merged daily sketches of one calendar month
+    
+    Long ranges merge these instead of every day. ``month`` is the first
+    day of the month; invalidating a day also invalidates its month.
+    """
+    month = models.DateField(unique=True)
+    
+    class Meta:
+        ordering = ['month']
+    
+    def __str__(self):
+        return f"Sketch for {self.month:%Y-%m} ({self.receipt_count} receipts)"
+
+class DuplicateKey(models.Model):
+    """Blocking key and text fingerprint used to find duplicate receipts
+    
+    Lookups scan the (amount_paise, day) index over a few days around the
+    receipt's date, so each check touches only a handful of rows.
+    """
+    receipt = models.OneToOneField(
+        Receipt,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='duplicate_key'
+    )
+    vendor_key = models.CharField(max_length=200)
+    amount_paise = models.BigIntegerField()
+    day = models.DateField()
+    simhash = models.BigIntegerField(default=0)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['amount_paise', 'day', 'vendor_key']),
+        ]
+    
+    def __str__(self):
+        return f"{self.vendor_key} / {self.amount_paise} / {self.day}"
+
+class RejectedFile(models.Model):
+    """A bulk-ingested file whose parse failed validation, by content hash
+    
+    ``manage.py ingest`` skips these on later runs instead of parsing them
+    again; ``--retry-rejected`` parses them anyway.
+    """
+    content_hash = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255)
+    reason = models.TextField(blank=True)
+    rejected_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.name} ({self.content_hash[:12]})"
@@ -0,0 +1,200 @@
+"""Downscaled receipt previews in a content-addressed, size-bounded disk cache
+
+Previews are keyed by the SHA-256 of the original file, so identical files
+share one preview and a cached preview never goes stale. The cache evicts
+the least recently used files once it grows past PREVIEW_CACHE_MAX_BYTES,
+checked at most once per PREVIEW_EVICTION_INTERVAL.
+"""
+import io
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Receipt
+from .storage import content_hash
+from .utils.extractors import load_backend
+
+logger = logging.getLogger(__name__)
+
+_eviction_lock = threading.Lock()
+_last_eviction = None
+
+_warm_executor = None
+_warm_executor_lock = threading.Lock()
+
+
+def preview_format():
+    """(Pillow format, file extension, content type) for stored previews"""
+    from PIL import features
+    if features.check('webp'):
+        return 'WEBP', 'webp', 'image/webp'
+    return 'JPEG', 'jpg', 'image/jpeg'
+
+
+def receipt_digest(receipt):
+    """The receipt's content hash, computed and stored for older rows"""
+    if not receipt.content_hash:
+        receipt.content_hash = content_hash(receipt.file.path)
+        # update() avoids bumping updated_at and firing save signals
+        Receipt.objects.filter(pk=receipt.pk).update(content_hash=receipt.content_hash)
+    return receipt.content_hash
+
+
+def preview_path(digest, size):
+    _, extension, _ = preview_format()
+    return os.path.join(settings.PREVIEW_ROOT, digest[:2], f'{digest}-{size}.{extension}')
+
+
+def get_preview(receipt, size='thumb'):
+    """Return (path, content type) of a cached preview, generating it if needed"""
+    pixels = settings.PREVIEW_SIZES[size]
+    image_format, _, content_type = preview_format()
+    path = preview_path(receipt_digest(receipt), size)
+
+    try:
+        os.utime(path)  # Mark as recently used for LRU eviction
+        return path, content_type
+    except FileNotFoundError:
+        pass
+
+    image = render_first_page(receipt.file.path)
+    image.thumbnail((pixels, pixels))
+    if image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as fh:
+        image.save(fh, image_format, quality=settings.PREVIEW_QUALITY)
+    os.replace(tmp_path, path)
+
+    maybe_evict_previews()
+    return path, content_type
+
+
+def warm_preview(receipt):
+    """Render the thumbnail in the background once the new receipt is committed"""
+    transaction.on_commit(lambda: _get_warm_executor().submit(_warm, receipt))
+
+
+def _get_warm_executor():
+    global _warm_executor
+    with _warm_executor_lock:
+        if _warm_executor is None:
+            # One thread: warming is best effort and must not compete with requests
+            _warm_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='preview-warm')
+        return _warm_executor
+
+
+def _warm(receipt):
+    try:
+        get_preview(receipt, 'thumb')
+    except Exception:
+        # The preview endpoint retries on first request
+        logger.exception('Preview warm-up failed for receipt %s', receipt.pk)
+
+
+def render_first_page(path):
+    """Load an image of the receipt: the photo itself, or page 1 of a PDF/text"""
+    image_module = load_backend('image')
+    extension = path.lower().split('.')[-1]
+
+    if extension in ['jpg', 'jpeg', 'png']:
+        image = image_module.open(path)
+        image.draft('RGB', (settings.PREVIEW_SIZES['medium'],) * 2)  # Fast JPEG downscale
+        return image
+
+    if extension == 'pdf':
+        image = _render_pdf_page(path)
+        if image is not None:
+            return image
+        reader = load_backend('pdf').PdfReader(path)
+        text = reader.pages[0].extract_text() if reader.pages else ''
+    else:
+        with open(path, 'rb') as fh:
+            text = fh.read(4096).decode('utf-8', errors='replace')
+
+    return _render_text(text)
+
+
+def _render_pdf_page(path):
+    """Rasterize PDF page 1 with pypdfium2 if installed, else use its largest image"""
+    try:
+        import pypdfium2
+    except ImportError:
+        pypdfium2 = None
+
+    if pypdfium2 is not None:
+        document = pypdfium2.PdfDocument(path)
+        try:
+            return document[0].render(scale=1).to_pil()
+        finally:
+            document.close()
+
+    # Scanned PDFs are usually one embedded image per page
+    reader = load_backend('pdf').PdfReader(path)
+    if not reader.pages:
+        return None
+    images = getattr(reader.pages[0], 'images', [])
+    if not images:
+        return None
+    largest = max(images, key=lambda embedded: len(embedded.data))
+    return load_backend('image').open(io.BytesIO(largest.data))
+
+
+def _render_text(text):
+    """Draw the first lines of a text receipt onto a page-shaped canvas"""
+    from PIL import ImageDraw
+
+    image = load_backend('image').new('RGB', (600, 800), 'white')
+    draw = ImageDraw.Draw(image)
+    for line_number, line in enumerate(text.splitlines()[:60]):
+        draw.text((20, 20 + line_number * 12), line[:90], fill='black')
+    return image
+
+
+def maybe_evict_previews():
+    """Run ``evict_previews`` at most once per PREVIEW_EVICTION_INTERVAL"""
+    global _last_eviction
+    now = time.monotonic()
+    with _eviction_lock:
+        if _last_eviction is not None and now - _last_eviction < settings.PREVIEW_EVICTION_INTERVAL:
+            return
+        _last_eviction = now
+    evict_previews()
+
+
+def evict_previews():
+    """Delete least recently used previews until the cache fits its budget"""
+    with _eviction_lock:
+        entries = []
+        total = 0
+        for root, _, files in os.walk(settings.PREVIEW_ROOT):
+            for name in files:
+                if name.endswith('.tmp'):
+                    continue  # Another worker's preview being written
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        if total <= settings.PREVIEW_CACHE_MAX_BYTES:
+            return
+
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            if total <= settings.PREVIEW_CACHE_MAX_BYTES:
+                break
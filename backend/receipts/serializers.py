@@ -1,11 +1,60 @@
 from rest_framework import serializers
+from rest_framework.reverse import reverse
+from rest_framework.utils.urls import replace_query_param
 from .models import Receipt
 
-class ReceiptSerializer(serializers.ModelSerializer):
+def parse_fields_param(value):
+    """Parse a ``fields`` query parameter into a set of field names"""
+    if not value:
+        return set()
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+class SparseFieldsMixin:
+    """Limit output to the comma-separated ``?fields=`` query parameter"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        
+        request = self.context.get('request')
+        if request is None:
+            return
+        
+        requested = parse_fields_param(request.query_params.get('fields'))
+        if requested:
+            for field_name in set(self.fields) - requested:
+                self.fields.pop(field_name)
+
+class PreviewUrlMixin(serializers.Serializer):
+    """Adds ``preview_url``, versioned by content hash so it can be cached forever"""
+    preview_url = serializers.SerializerMethodField()
+    
+    def get_preview_url(self, obj):
+        url = reverse('receipt-preview', args=[obj.pk], request=self.context.get('request'))
+        if obj.content_hash:
+            # reverse() may already have added a query string (e.g. ?version=)
+            url = replace_query_param(url, 'v', obj.content_hash)
+        return url
+
+class ReceiptSerializer(SparseFieldsMixin, PreviewUrlMixin, serializers.ModelSerializer):
     class Meta:
         model = Receipt
         fields = '__all__'
-        read_only_fields = ('id', 'created_at', 'updated_at')
+        read_only_fields = ('id', 'content_hash', 'raw_text_archived', 'extraction_stage', 'created_at', 'updated_at')
+    
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if 'raw_text' in data and instance.raw_text_archived:
+            # Decompress archived text only when the detail is rendered
+            data['raw_text'] = instance.get_raw_text()
+        return data
+
+class ReceiptListSerializer(SparseFieldsMixin, PreviewUrlMixin, serializers.ModelSerializer):
+    """Lightweight representation without the OCR ``raw_text``"""
+    
+    class Meta:
+        model = Receipt
+        exclude = ('raw_text',)
+        read_only_fields = ('id', 'content_hash', 'raw_text_archived', 'extraction_stage', 'created_at', 'updated_at')
 
 class ReceiptUploadSerializer(serializers.Serializer):
     file = serializers.FileField()
@@ -18,4 +67,20 @@ class ReceiptUploadSerializer(serializers.Serializer):
 class ReceiptUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Receipt
-        fields = ['vendor', 'transaction_date', 'amount', 'category']
+        fields = ['vendor', 'transaction_date', 'amount', 'category', 'duplicate_of']
+    
+    def validate_duplicate_of(self, value):
+        """Duplicates point straight at their original: no self-links or chains"""
+        if value is None:
+            return value
+        if self.instance is not None and value.pk == self.instance.pk:
+            raise serializers.ValidationError('A receipt cannot duplicate itself')
+        if value.duplicate_of_id is not None:
+            raise serializers.ValidationError(
+                'That receipt is itself a duplicate; point at its original instead'
+            )
+        if self.instance is not None and self.instance.duplicates.exists():
+            raise serializers.ValidationError(
+                'This receipt is the original of other receipts and cannot be a duplicate'
+            )
+        return value
@@ -0,0 +1,65 @@
+from django.conf import settings
+
+
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """Apply SQLITE_PRAGMAS to each new SQLite connection"""
+    if connection.vendor != 'sqlite':
+        return
+
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value};')
+
+
+def record_receipt_deletion(sender, instance, **kwargs):
+    """Leave a tombstone for the changes feed when a receipt is deleted"""
+    from .models import ReceiptTombstone
+    ReceiptTombstone.objects.create(receipt_id=instance.pk)
+
+
+def remember_previous_date(sender, instance, **kwargs):
+    """Stash the stored transaction_date so a date change invalidates both days"""
+    instance._previous_transaction_date = None
+    if instance.pk and not instance._state.adding:
+        instance._previous_transaction_date = (
+            sender.objects.filter(pk=instance.pk)
+            .values_list('transaction_date', flat=True)
+            .first()
+        )
+
+
+def invalidate_daily_sketches(sender, instance, **kwargs):
+    """Drop the approximate-analytics sketches for the receipt's day(s)"""
+    from .approximate import invalidate_days
+    invalidate_days(
+        instance.transaction_date,
+        getattr(instance, '_previous_transaction_date', None)
+    )
+
+
+def wake_event_stream(sender, instance, **kwargs):
+    """Push the change to live dashboards once it is committed"""
+    from django.db import transaction
+    from .events import receipt_events
+    transaction.on_commit(receipt_events.wake)
+
+
+def release_duplicates(sender, instance, **kwargs):
+    """Unflag a deleted receipt's duplicates, bumping updated_at for sync clients
+
+    The foreign key's SET_NULL would clear duplicate_of without touching
+    updated_at, leaving clients pointing at the deleted receipt.
+    """
+    from django.utils import timezone
+    sender.objects.filter(duplicate_of=instance.pk).update(
+        duplicate_of=None, updated_at=timezone.now()
+    )
+
+
+def index_duplicate_key(sender, instance, raw=False, **kwargs):
+    """Keep the receipt's duplicate-detection key current"""
+    if raw:
+        return
+    from .duplicates import index_receipt
+    index_receipt(instance)
@@ -0,0 +1,29 @@
+import hashlib
+
+from .models import Receipt
+
+
+def spool_upload(file):
+    """Write an upload to its final storage location exactly once
+    
+    The storage streams the upload in chunks, or simply moves the temporary
+    file when the upload was already spooled to disk. Returns the stored
+    name (for ``Receipt.file``) and its local path (for parsing).
+    """
+    field = Receipt._meta.get_field('file')
+    name = field.storage.save(field.generate_filename(None, file.name), file)
+    return name, field.storage.path(name)
+
+
+def discard_upload(name):
+    """Remove a spooled upload that did not become a receipt"""
+    Receipt._meta.get_field('file').storage.delete(name)
+
+
+def content_hash(path, chunk_size=1024 * 1024):
+    """SHA-256 hex digest of a stored file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,50 @@
+import json
+from datetime import date
+
+from django.test import TestCase
+from django.test.client import AsyncRequestFactory
+
+from receipts.async_views import receipt_analytics
+from receipts.cache import receipt_table_cache
+from receipts.models import Receipt
+
+
+class AnalyticsViewTests(TestCase):
+    url = '/api/receipts/analytics/'
+
+    def setUp(self):
+        receipt_table_cache.invalidate()
+        self.addCleanup(receipt_table_cache.invalidate)
+        for vendor, day, amount in (('Big Bazaar', date(2024, 1, 1), 100),
+                                    ('Big Bazaar', date(2024, 1, 2), 50),
+                                    ('Indian Oil', date(2024, 2, 1), 300)):
+            Receipt.objects.create(file='receipts/r.txt', vendor=vendor,
+                                   transaction_date=day, amount=amount)
+
+    def check_exact(self, data):
+        self.assertNotIn('approximate', data)
+        self.assertEqual(data['statistics']['count'], 3)
+        self.assertEqual(data['vendor_frequency'], {'Big Bazaar': 2, 'Indian Oil': 1})
+
+    def check_approximate(self, data):
+        self.assertTrue(data['approximate'])
+        self.assertIn('error_bounds', data)
+        self.assertEqual(data['statistics']['count'], 2)
+        self.assertEqual(data['statistics']['total_spend'], 150)
+
+    def test_sync_view(self):
+        self.check_exact(self.client.get(self.url).json())
+        params = {'approximate': 'true', 'start_date': '2024-01-01', 'end_date': '2024-01-31'}
+        self.check_approximate(self.client.get(self.url, params).json())
+        # Filters the sketches cannot answer fall back to exact analytics
+        self.check_exact(self.client.get(self.url, {'approximate': 'true', 'category': 'other'}).json())
+
+    async def test_async_view(self):
+        factory = AsyncRequestFactory()
+        response = await receipt_analytics(factory.get(self.url))
+        self.check_exact(json.loads(response.content))
+        params = {'approximate': 'true', 'start_date': '2024-01-01', 'end_date': '2024-01-31'}
+        response = await receipt_analytics(factory.get(self.url, params))
+        self.check_approximate(json.loads(response.content))
+        response = await receipt_analytics(factory.get(self.url, {'approximate': 'true', 'vendor': 'Big'}))
+        self.assertNotIn('approximate', json.loads(response.content))
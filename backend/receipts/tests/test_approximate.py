@@ -0,0 +1,105 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+
+from receipts.approximate import build_daily_sketch, invalidate_days, merged_sketch
+from receipts.models import Receipt, DailySketch, MonthlySketch
+
+
+class DailySketchTests(TestCase):
+    def add_receipt(self, vendor, day, amount):
+        return Receipt.objects.create(
+            file='receipts/r.txt', vendor=vendor, transaction_date=day, amount=Decimal(amount)
+        )
+
+    def setUp(self):
+        self.add_receipt('Big Bazaar', date(2024, 1, 1), '100.00')
+        self.add_receipt('Indian Oil', date(2024, 1, 1), '50.00')
+        self.add_receipt('Big Bazaar', date(2024, 1, 2), '25.00')
+
+    def test_new_days_get_stale_rows(self):
+        self.assertEqual(
+            list(DailySketch.objects.values_list('day', 'stale')),
+            [(date(2024, 1, 1), True), (date(2024, 1, 2), True)]
+        )
+
+    def test_merged_sketch_builds_each_stale_day(self):
+        sketch = merged_sketch()
+        self.assertEqual(sketch.receipt_count, 3)
+        self.assertEqual(sketch.total_paise, 17500)
+        self.assertFalse(DailySketch.objects.filter(stale=True).exists())
+
+        self.assertEqual(merged_sketch(start_date=date(2024, 1, 2)).receipt_count, 1)
+
+    def test_receipt_change_invalidates_its_days(self):
+        merged_sketch()
+        receipt = Receipt.objects.get(amount=Decimal('25.00'))
+        receipt.transaction_date = date(2024, 1, 3)
+        receipt.save()
+        self.assertEqual(
+            set(DailySketch.objects.filter(stale=True).values_list('day', flat=True)),
+            {date(2024, 1, 2), date(2024, 1, 3)}
+        )
+        self.assertEqual(merged_sketch(end_date=date(2024, 1, 2)).receipt_count, 2)
+
+    def test_build_racing_an_invalidation_is_not_stored(self):
+        row = DailySketch.objects.get(day=date(2024, 1, 1))
+        # A receipt on the day changes after the build read the row
+        invalidate_days(row.day)
+        build_daily_sketch(row)
+        stored = DailySketch.objects.get(day=row.day)
+        self.assertTrue(stored.stale)
+        self.assertEqual(stored.receipt_count, 0)
+
+
+class MonthlySketchTests(TestCase):
+    def setUp(self):
+        for day, amount in [
+            (date(2024, 1, 15), '10.00'),
+            (date(2024, 1, 31), '20.00'),
+            (date(2024, 2, 1), '40.00'),
+            (date(2024, 2, 29), '80.00'),
+            (date(2024, 3, 1), '160.00'),
+        ]:
+            Receipt.objects.create(
+                file='receipts/r.txt', vendor='Big Bazaar', transaction_date=day, amount=Decimal(amount)
+            )
+
+    def total(self, start_date=None, end_date=None):
+        return merged_sketch(start_date, end_date).total_paise // 100
+
+    def test_months_get_stale_rows(self):
+        self.assertEqual(
+            list(MonthlySketch.objects.values_list('month', 'stale')),
+            [(date(2024, 1, 1), True), (date(2024, 2, 1), True), (date(2024, 3, 1), True)]
+        )
+
+    def test_ranges_across_month_boundaries(self):
+        self.assertEqual(self.total(), 310)
+        self.assertEqual(self.total(date(2024, 1, 16), date(2024, 2, 29)), 140)
+        self.assertEqual(self.total(date(2024, 1, 31), date(2024, 3, 1)), 300)
+        self.assertEqual(self.total(date(2024, 2, 1), date(2024, 2, 28)), 40)
+        self.assertEqual(self.total(date(2024, 1, 20), date(2024, 2, 10)), 60)
+        self.assertEqual(self.total(end_date=date(2024, 1, 31)), 30)
+        self.assertEqual(self.total(start_date=date(2024, 2, 1)), 280)
+        self.assertFalse(MonthlySketch.objects.filter(stale=True).exists())
+
+    def test_whole_months_use_the_rollup(self):
+        merged_sketch(date(2024, 2, 1), date(2024, 2, 29))
+        # Built from the daily rows, which are rebuilt along the way
+        self.assertFalse(MonthlySketch.objects.get(month=date(2024, 2, 1)).stale)
+        self.assertFalse(DailySketch.objects.filter(day__month=2, stale=True).exists())
+        self.assertTrue(MonthlySketch.objects.get(month=date(2024, 1, 1)).stale)
+
+    def test_receipt_change_invalidates_its_month(self):
+        merged_sketch()
+        Receipt.objects.create(
+            file='receipts/r.txt', vendor='Indian Oil', transaction_date=date(2024, 2, 10),
+            amount=Decimal('5.00')
+        )
+        self.assertEqual(
+            list(MonthlySketch.objects.filter(stale=True).values_list('month', flat=True)),
+            [date(2024, 2, 1)]
+        )
+        self.assertEqual(self.total(date(2024, 2, 1), date(2024, 2, 29)), 125)
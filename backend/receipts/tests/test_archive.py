@@ -0,0 +1,64 @@
+from datetime import date
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from receipts.models import Receipt, ReceiptText
+
+
+class ArchivedTextSearchTests(TestCase):
+    def setUp(self):
+        self.archived = Receipt.objects.create(
+            file='receipts/a.txt', vendor='Big Bazaar', transaction_date=date(2020, 1, 1),
+            amount=100, raw_text='BIG BAZAAR\nGSTIN 29ABCDE1234F1Z5\nTotal 100.00'
+        )
+        self.recent = Receipt.objects.create(
+            file='receipts/b.txt', vendor='Indian Oil', transaction_date=date.today(),
+            amount=50, raw_text='INDIAN OIL\nGSTIN 27ZZZZZ9999Z1Z9\nTotal 50.00'
+        )
+        self.updated_at = self.archived.updated_at
+        call_command('archive_receipts', '--older-than-months=12', '--train-dictionary', stdout=StringIO())
+        self.archived.refresh_from_db()
+
+    def ids(self, response):
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        results = data['results'] if isinstance(data, dict) else data
+        return {result['id'] for result in results}
+
+    def test_archive_bumps_updated_at(self):
+        self.assertTrue(self.archived.raw_text_archived)
+        self.assertEqual(self.archived.raw_text, '')
+        self.assertGreater(self.archived.updated_at, self.updated_at)
+
+    def test_list_search_matches_archived_text(self):
+        response = self.client.get('/api/receipts/', {'search': '29abcde', 'include_archived': 'true'})
+        self.assertEqual(self.ids(response), {str(self.archived.pk)})
+        response = self.client.get('/api/receipts/', {'search': 'GSTIN', 'include_archived': 'true'})
+        self.assertEqual(self.ids(response), {str(self.archived.pk), str(self.recent.pk)})
+
+    def test_list_search_skips_archived_text_by_default(self):
+        response = self.client.get('/api/receipts/', {'search': 'GSTIN'})
+        self.assertEqual(self.ids(response), {str(self.recent.pk)})
+        response = self.client.get('/api/receipts/', {'search': 'bazaar'})
+        self.assertEqual(self.ids(response), {str(self.archived.pk)})
+
+    def test_pattern_search_matches_archived_text(self):
+        response = self.client.get('/api/receipts/search/', {
+            'type': 'pattern', 'field': 'raw_text', 'q': r'GSTIN 2\d', 'include_archived': 'true'
+        })
+        self.assertEqual(self.ids(response), {str(self.archived.pk), str(self.recent.pk)})
+        response = self.client.get('/api/receipts/search/', {
+            'type': 'pattern', 'field': 'raw_text', 'q': 'Total 100', 'include_archived': 'true'
+        })
+        self.assertEqual(self.ids(response), {str(self.archived.pk)})
+
+    def test_pattern_search_skips_archived_text_by_default(self):
+        with mock.patch.object(ReceiptText, 'texts_for') as texts_for:
+            response = self.client.get('/api/receipts/search/', {
+                'type': 'pattern', 'field': 'raw_text', 'q': r'GSTIN 2\d'
+            })
+        texts_for.assert_not_called()
+        self.assertEqual(self.ids(response), {str(self.recent.pk)})
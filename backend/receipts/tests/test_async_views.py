@@ -0,0 +1,73 @@
+import asyncio
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.test.client import AsyncRequestFactory
+
+from receipts.async_views import receipt_analytics, upload_receipt
+from receipts.models import Receipt
+
+RECEIPT = b'BIG BAZAAR\n12/03/2024\nTotal: 450.00'
+
+
+class AsyncUploadTests(TestCase):
+    url = '/api/receipts/upload/'
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.media_root = media.name
+        # Parse on the loop's default thread pool rather than starting processes
+        self.enterContext(mock.patch('receipts.async_views.get_parser_pool', return_value=None))
+        self.factory = AsyncRequestFactory()
+
+    def stored_files(self):
+        return [name for _, _, files in os.walk(self.media_root) for name in files]
+
+    async def upload(self, name, content):
+        request = self.factory.post(self.url, {'file': SimpleUploadedFile(name, content)})
+        try:
+            return await upload_receipt(request)
+        finally:
+            # The handler closes uploads after the response; the view is called directly here
+            request.close()
+
+    async def test_upload_creates_the_receipt(self):
+        response = await self.upload('receipt.txt', RECEIPT)
+        self.assertEqual(response.status_code, 201)
+        data = json.loads(response.content)
+        self.assertEqual(data['vendor'], 'Big Bazaar')
+        receipt = await Receipt.objects.aget(pk=data['id'])
+        self.assertEqual(self.stored_files(), [os.path.basename(receipt.file.name)])
+
+    async def test_rejected_upload_removes_the_file(self):
+        response = await self.upload('blank.txt', b'nothing useful here')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(await Receipt.objects.aexists())
+        self.assertEqual(self.stored_files(), [])
+
+    async def test_other_methods_are_not_allowed(self):
+        response = await upload_receipt(self.factory.get(self.url))
+        self.assertEqual(response.status_code, 405)
+
+
+class BackpressureTests(TestCase):
+    @override_settings(ASYNC_QUEUE_TIMEOUT=0.01)
+    async def test_busy_server_returns_503(self):
+        slots = asyncio.Semaphore(0)
+        with mock.patch('receipts.async_views.get_request_slots', return_value=slots):
+            response = await receipt_analytics(AsyncRequestFactory().get('/api/receipts/analytics/'))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+
+    async def test_slot_is_released_after_the_request(self):
+        slots = asyncio.Semaphore(1)
+        with mock.patch('receipts.async_views.get_request_slots', return_value=slots):
+            response = await receipt_analytics(AsyncRequestFactory().get('/api/receipts/analytics/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(slots.locked())
@@ -0,0 +1,33 @@
+import uuid
+from datetime import date, timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from receipts.models import Receipt, ReceiptTombstone
+
+
+class ChangesFeedTests(TestCase):
+    def setUp(self):
+        receipt = Receipt.objects.create(
+            file='receipts/a.txt', vendor='Big Bazaar',
+            transaction_date=date(2024, 1, 1), amount=100
+        )
+        receipt.delete()
+        expired = ReceiptTombstone.objects.create(receipt_id=uuid.uuid4())
+        ReceiptTombstone.objects.filter(pk=expired.pk).update(
+            deleted_at=timezone.now() - timedelta(days=settings.TOMBSTONE_RETENTION_DAYS + 1)
+        )
+
+    def test_get_does_not_prune_tombstones(self):
+        response = self.client.get('/api/receipts/changes/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['reset'])
+        self.assertEqual(ReceiptTombstone.objects.count(), 2)
+
+    def test_prune_tombstones_deletes_only_expired(self):
+        call_command('prune_tombstones', stdout=StringIO())
+        self.assertEqual(ReceiptTombstone.objects.count(), 1)
@@ -0,0 +1,138 @@
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from receipts.utils.algorithms import ReceiptAnalytics
+from receipts.utils.columnar import ColumnarAnalytics, ReceiptTable
+
+RECORDS = [
+    {'id': '1', 'vendor': 'Big Bazaar', 'transaction_date': date(2024, 1, 5),
+     'amount': Decimal('250.00'), 'category': 'groceries'},
+    {'id': '2', 'vendor': 'Reliance Fresh', 'transaction_date': date(2024, 1, 5),
+     'amount': Decimal('99.50'), 'category': 'groceries'},
+    {'id': '3', 'vendor': 'Big Bazaar', 'transaction_date': date(2024, 1, 9),
+     'amount': Decimal('99.50'), 'category': 'groceries'},
+    {'id': '4', 'vendor': 'Indian Oil', 'transaction_date': date(2024, 2, 1),
+     'amount': Decimal('1500.00'), 'category': 'fuel'},
+    {'id': '5', 'vendor': 'Indian Oil', 'transaction_date': date(2024, 2, 14),
+     'amount': Decimal('1500.00'), 'category': 'fuel'},
+    {'id': '6', 'vendor': 'Cafe Coffee Day', 'transaction_date': date(2024, 3, 2),
+     'amount': Decimal('320.75'), 'category': 'dining'},
+]
+
+
+def without_numpy():
+    return mock.patch('receipts.utils.columnar.numpy', return_value=None)
+
+
+class ReceiptTableTests(SimpleTestCase):
+    def setUp(self):
+        self.table = ReceiptTable.from_records(RECORDS)
+
+    def filtered_ids(self, **bounds):
+        return sorted(self.table.filter(**bounds).ids)
+
+    def check_filters(self):
+        self.assertEqual(self.filtered_ids(category='fuel'), ['4', '5'])
+        self.assertEqual(self.filtered_ids(category='travel'), [])
+        self.assertEqual(self.filtered_ids(min_amount=99.5, max_amount=320.75), ['1', '2', '3', '6'])
+        self.assertEqual(
+            self.filtered_ids(start_date=date(2024, 1, 9), end_date=date(2024, 2, 14)),
+            ['3', '4', '5'],
+        )
+        self.assertEqual(
+            self.filtered_ids(category='groceries', min_amount=100, start_date=date(2024, 1, 1)),
+            ['1'],
+        )
+
+    def test_filter(self):
+        self.check_filters()
+
+    def test_filter_without_numpy(self):
+        with without_numpy():
+            self.check_filters()
+
+    def test_upsert_overwrites_row(self):
+        self.table.upsert({**RECORDS[0], 'amount': Decimal('10.00'), 'category': 'fuel'})
+        self.assertEqual(len(self.table), len(RECORDS))
+        self.assertEqual(self.filtered_ids(category='fuel'), ['1', '4', '5'])
+
+    def test_remove_swaps_last_row(self):
+        self.assertTrue(self.table.remove('2'))
+        self.assertFalse(self.table.remove('2'))
+        self.assertNotIn('2', self.table)
+        self.assertEqual(self.table.records_for_ids(['6'])[0]['amount'], Decimal('320.75'))
+        self.assertEqual(sorted(self.table.ids), ['1', '3', '4', '5', '6'])
+
+
+class AnalyticsParityTests(SimpleTestCase):
+    """ColumnarAnalytics must agree with ReceiptAnalytics on the same receipts"""
+
+    def assert_parity(self, records):
+        table = ReceiptTable.from_records(records)
+        rows = [{key: value for key, value in record.items() if key != 'id'} for record in records]
+
+        expected = ReceiptAnalytics.compute_statistics(rows)
+        actual = ColumnarAnalytics.compute_statistics(table)
+        self.assertEqual(actual.keys(), expected.keys())
+        for key, value in expected.items():
+            if value is None:
+                self.assertIsNone(actual[key], key)
+            else:
+                self.assertAlmostEqual(actual[key], value, places=6, msg=key)
+
+        self.assertEqual(
+            ColumnarAnalytics.vendor_frequency_analysis(table),
+            ReceiptAnalytics.vendor_frequency_analysis(rows),
+        )
+        self.assertEqual(
+            ColumnarAnalytics.top_k_vendors(table, 3),
+            ReceiptAnalytics.top_k_vendors(rows, 3),
+        )
+
+        expected = ReceiptAnalytics.category_distribution(rows)
+        actual = ColumnarAnalytics.category_distribution(table)
+        self.assertEqual(actual.keys(), expected.keys())
+        for category, data in expected.items():
+            self.assertEqual(actual[category]['count'], data['count'])
+            self.assertAlmostEqual(actual[category]['total'], data['total'], places=6)
+            self.assertEqual(actual[category]['receipts'], data['receipts'])
+
+        expected = ReceiptAnalytics.time_series_analysis(rows, window_days=2)
+        actual = ColumnarAnalytics.time_series_analysis(table, window_days=2)
+        self.assertEqual(actual['dates'], expected['dates'])
+        for key in ('amounts', 'moving_avg'):
+            for a, b in zip(actual[key], expected[key]):
+                self.assertAlmostEqual(a, b, places=6)
+
+    def test_parity(self):
+        self.assert_parity(RECORDS)
+
+    def test_parity_without_numpy(self):
+        with without_numpy():
+            self.assert_parity(RECORDS)
+
+    def test_mode_tie_goes_to_smallest_amount(self):
+        # 99.50 and 1500.00 both appear twice, in either order
+        for records in (RECORDS, RECORDS[::-1]):
+            self.assertEqual(ReceiptAnalytics.compute_statistics(records)['mode_spend'], 99.5)
+            table = ReceiptTable.from_records(records)
+            self.assertEqual(ColumnarAnalytics.compute_statistics(table)['mode_spend'], 99.5)
+            with without_numpy():
+                self.assertEqual(ColumnarAnalytics.compute_statistics(table)['mode_spend'], 99.5)
+
+    def test_no_mode_when_amounts_are_distinct(self):
+        records = [RECORDS[0], RECORDS[1], RECORDS[3], RECORDS[5]]
+        self.assertIsNone(ReceiptAnalytics.compute_statistics(records)['mode_spend'])
+        table = ReceiptTable.from_records(records)
+        self.assertIsNone(ColumnarAnalytics.compute_statistics(table)['mode_spend'])
+        with without_numpy():
+            self.assertIsNone(ColumnarAnalytics.compute_statistics(table)['mode_spend'])
+
+    def test_category_receipts_have_no_id(self):
+        table = ReceiptTable.from_records(RECORDS)
+        for data in ColumnarAnalytics.category_distribution(table).values():
+            for receipt in data['receipts']:
+                self.assertNotIn('id', receipt)
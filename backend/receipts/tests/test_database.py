@@ -0,0 +1,58 @@
+import os
+import runpy
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase
+
+
+def load_settings(**environ):
+    """The settings module's globals as evaluated under ``environ``"""
+    with mock.patch.dict(os.environ, environ):
+        return runpy.run_path(os.path.join(settings.BASE_DIR, 'receipt_processor', 'settings.py'))
+
+
+class SqlitePragmaTests(SimpleTestCase):
+    def test_new_connections_get_the_pragmas(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        wrapper = DatabaseWrapper(
+            {**connection.settings_dict, 'NAME': os.path.join(directory.name, 'pragmas.db')}, alias='pragmas'
+        )
+        self.addCleanup(wrapper.close)
+
+        with wrapper.cursor() as cursor:
+            pragmas = {}
+            for name in ('journal_mode', 'synchronous', 'busy_timeout', 'temp_store', 'foreign_keys'):
+                cursor.execute(f'PRAGMA {name}')
+                pragmas[name] = cursor.fetchone()[0]
+        self.assertEqual(pragmas, {
+            'journal_mode': 'wal',
+            'synchronous': 1,  # NORMAL
+            'busy_timeout': 20000,
+            'temp_store': 2,  # MEMORY
+            'foreign_keys': 1,
+        })
+
+
+class DatabaseSettingsTests(SimpleTestCase):
+    def test_sqlite_keeps_connections_open(self):
+        database = load_settings(DB_ENGINE='sqlite', DB_CONN_MAX_AGE='120')['DATABASES']['default']
+        self.assertEqual(database['ENGINE'], 'django.db.backends.sqlite3')
+        self.assertEqual(database['CONN_MAX_AGE'], 120)
+
+    def test_postgres_behind_pgbouncer(self):
+        loaded = load_settings(DB_ENGINE='postgres', DB_POOLER='pgbouncer', DB_HOST='db')
+        database = loaded['DATABASES']['default']
+        self.assertEqual(database['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual(database['HOST'], 'db')
+        self.assertTrue(database['CONN_HEALTH_CHECKS'])
+        self.assertTrue(database['DISABLE_SERVER_SIDE_CURSORS'])
+        self.assertIn('django.contrib.postgres', loaded['INSTALLED_APPS'])
+
+    def test_postgres_without_pooler_keeps_server_side_cursors(self):
+        database = load_settings(DB_ENGINE='postgres')['DATABASES']['default']
+        self.assertFalse(database['DISABLE_SERVER_SIDE_CURSORS'])
@@ -0,0 +1,78 @@
+import os
+import tempfile
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from receipts.models import Receipt
+from receipts.serializers import ReceiptUpdateSerializer
+
+
+def receipt(vendor='Big Bazaar', day=date(2024, 3, 12), amount=450, **fields):
+    return Receipt.objects.create(
+        file='receipts/r.txt', vendor=vendor, transaction_date=day, amount=amount, **fields
+    )
+
+
+class DuplicateOfValidationTests(TestCase):
+    def setUp(self):
+        self.original = receipt()
+        self.duplicate = receipt(duplicate_of=self.original)
+        self.other = receipt(vendor='Indian Oil', amount=900)
+
+    def errors(self, instance, target):
+        serializer = ReceiptUpdateSerializer(
+            instance, data={'duplicate_of': target.pk if target else None}, partial=True
+        )
+        serializer.is_valid()
+        return serializer.errors.get('duplicate_of')
+
+    def test_valid_links(self):
+        self.assertIsNone(self.errors(self.other, self.original))
+        self.assertIsNone(self.errors(self.duplicate, None))
+
+    def test_self_reference_is_rejected(self):
+        self.assertIsNotNone(self.errors(self.other, self.other))
+
+    def test_chains_are_rejected(self):
+        # Target is itself a duplicate
+        self.assertIsNotNone(self.errors(self.other, self.duplicate))
+        # Receipt is already the original of another
+        self.assertIsNotNone(self.errors(self.original, self.other))
+
+
+class OriginalDeletionTests(TestCase):
+    def test_deleting_an_original_unflags_and_touches_its_duplicates(self):
+        original = receipt()
+        duplicate = receipt(duplicate_of=original)
+        updated_at = duplicate.updated_at
+
+        original.delete()
+        duplicate.refresh_from_db()
+        self.assertIsNone(duplicate.duplicate_of_id)
+        self.assertGreater(duplicate.updated_at, updated_at)
+
+
+class IngestBatchDuplicateTests(TestCase):
+    def test_duplicates_within_one_batch_are_flagged(self):
+        media, source = tempfile.TemporaryDirectory(), tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.addCleanup(source.cleanup)
+        # Same purchase as an e-mailed copy and a differently formatted scan
+        for name, text in (('a-email.txt', 'BIG BAZAAR\n12/03/2024\nTotal: 450.00'),
+                           ('b-scan.txt', 'Big Bazaar Pvt Ltd\n12-03-2024\nTOTAL 450.00\n'),
+                           ('c-other.txt', 'DMART\n12/03/2024\nTotal: 120.00')):
+            with open(os.path.join(source.name, name), 'w') as fh:
+                fh.write(text)
+
+        with override_settings(MEDIA_ROOT=media.name):
+            call_command('ingest', source.name, '--workers=1', stdout=StringIO())
+
+        receipts = list(Receipt.objects.order_by('file'))
+        self.assertEqual([r.vendor for r in receipts], ['Big Bazaar', 'Big Bazaar', 'Dmart'])
+        email, scan, other = receipts
+        self.assertIsNone(email.duplicate_of_id)
+        self.assertEqual(scan.duplicate_of_id, email.pk)
+        self.assertIsNone(other.duplicate_of_id)
@@ -0,0 +1,63 @@
+import asyncio
+import json
+from datetime import date
+from unittest import mock
+
+from django.test import RequestFactory, TestCase
+
+from receipts.async_views import stream_events
+from receipts.events import ReceiptEventFeed
+from receipts.models import Receipt
+
+
+class SnapshotTests(TestCase):
+    def setUp(self):
+        for i in range(5):
+            Receipt.objects.create(
+                file='receipts/r.txt', vendor=f'Vendor {i}',
+                transaction_date=date(2024, 1, 1), amount=(i + 1) * 10
+            )
+
+    def test_snapshot_sends_top_vendors_only(self):
+        with mock.patch('receipts.events.SNAPSHOT_VENDORS', 2):
+            snapshot = ReceiptEventFeed().snapshot()
+        self.assertEqual(list(snapshot['vendors']), ['Vendor 4', 'Vendor 3'])
+        self.assertEqual(snapshot['vendors']['Vendor 4'], {'count': 1, 'total': 50.0})
+        self.assertEqual(snapshot['statistics']['count'], 5)
+
+    def test_deltas_carry_touched_vendors(self):
+        feed = ReceiptEventFeed()
+        feed.snapshot()
+        receipt = Receipt.objects.get(vendor='Vendor 0')
+        receipt.amount = 7
+        receipt.save()
+        analytics = dict(feed.poll())['analytics']
+        self.assertEqual(analytics['vendors'], {'Vendor 0': {'count': 1, 'total': 7.0}})
+
+
+class StreamUrlTests(TestCase):
+    def test_receipt_events_carry_absolute_urls_like_the_changes_feed(self):
+        feed = ReceiptEventFeed()
+        feed.snapshot()
+        receipt = Receipt.objects.create(
+            file='receipts/r.txt', vendor='Big Bazaar', transaction_date=date(2024, 1, 1),
+            amount=10, content_hash='abc123'
+        )
+        events = [event for event in feed.poll() if event[0] == 'receipt.created']
+
+        queue = asyncio.Queue()
+        for event in events + [None]:
+            queue.put_nowait(event)
+        request = RequestFactory().get('/api/receipts/events/')
+
+        async def collect():
+            return [chunk async for chunk in stream_events(queue, {}, request.build_absolute_uri)]
+
+        chunks = asyncio.run(collect())
+        streamed = json.loads(chunks[1].split('data: ', 1)[1])
+
+        changed = self.client.get('/api/receipts/changes/').json()['changed']
+        expected = next(item for item in changed if item['id'] == str(receipt.pk))
+        self.assertTrue(streamed['file'].startswith('http://testserver/'))
+        self.assertEqual(streamed['file'], expected['file'])
+        self.assertEqual(streamed['preview_url'], expected['preview_url'])
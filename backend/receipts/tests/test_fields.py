@@ -0,0 +1,53 @@
+import json
+from datetime import date
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from receipts.models import Receipt
+
+
+class SparseFieldsTests(TestCase):
+    def setUp(self):
+        self.receipt = Receipt.objects.create(
+            file='receipts/r.txt', vendor='Big Bazaar', transaction_date=date(2024, 1, 1),
+            amount=100, category='groceries', content_hash='abc123', raw_text='BIG BAZAAR\nTotal 100.00'
+        )
+
+    def get(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+        selects = [query['sql'] for query in queries if query['sql'].startswith('SELECT')]
+        return response, ' '.join(selects)
+
+    def test_list_defers_raw_text(self):
+        response, sql = self.get('/api/receipts/')
+        self.assertNotIn('raw_text', response.json()[0])
+        self.assertNotIn('"raw_text"', sql)
+
+    def test_list_selects_only_requested_fields(self):
+        response, sql = self.get('/api/receipts/', {'fields': 'id,vendor,amount'})
+        self.assertEqual(set(response.json()[0]), {'id', 'vendor', 'amount'})
+        self.assertIn('"vendor"', sql)
+        self.assertNotIn('"category"', sql)
+        self.assertNotIn('"raw_text"', sql)
+
+    def test_raw_text_is_never_listed(self):
+        response, sql = self.get('/api/receipts/', {'fields': 'id,raw_text'})
+        self.assertEqual(set(response.json()[0]), {'id'})
+        self.assertNotIn('"raw_text"', sql)
+
+    def test_preview_url_loads_the_content_hash(self):
+        response, _ = self.get('/api/receipts/', {'fields': 'id,preview_url'})
+        self.assertTrue(response.json()[0]['preview_url'].endswith('?v=abc123'))
+
+    def test_detail_includes_raw_text(self):
+        response, _ = self.get(f'/api/receipts/{self.receipt.pk}/')
+        self.assertEqual(response.json()['raw_text'], 'BIG BAZAAR\nTotal 100.00')
+
+    def test_json_export_defers_raw_text(self):
+        response, sql = self.get('/api/receipts/export/', {'format': 'json'})
+        self.assertNotIn('raw_text', json.loads(response.content)[0])
+        self.assertNotIn('"raw_text"', sql)
@@ -0,0 +1,52 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase
+
+from receipts.management.commands.importbudget import LAZY_MODULES
+
+
+def heavy_modules_after(script, **environ):
+    """The LAZY_MODULES a fresh interpreter has imported after running ``script``"""
+    check = (
+        'import sys, json; '
+        f'print(json.dumps(sorted({{name.split(".")[0] for name in sys.modules}} & set({LAZY_MODULES!r}))))'
+    )
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'receipt_processor.settings', **environ}
+    result = subprocess.run(
+        [sys.executable, '-c', f'import django; django.setup(); {script}; {check}'],
+        capture_output=True, text=True, env=env, cwd=settings.BASE_DIR, check=True
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+class LazyImportTests(SimpleTestCase):
+    def test_worker_startup_skips_heavy_modules(self):
+        for async_views in ('false', 'true'):
+            with self.subTest(ASYNC_VIEWS=async_views):
+                self.assertEqual(
+                    heavy_modules_after('import receipt_processor.urls', ASYNC_VIEWS=async_views), []
+                )
+
+    def test_text_receipts_parse_without_extraction_backends(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'receipt.txt')
+        with open(path, 'w') as fh:
+            fh.write('BIG BAZAAR\n12/03/2024\nTotal: 450.00')
+        script = f'from receipts.utils.parsers import parse_stored_file; parse_stored_file({path!r})'
+        self.assertEqual(heavy_modules_after(script), [])
+
+    def test_importbudget_fails_on_eager_imports(self):
+        script = 'import django; django.setup(); import receipt_processor.urls; import numpy'
+        with mock.patch('receipts.management.commands.importbudget.STARTUP_SCRIPT', script):
+            with self.assertRaisesMessage(CommandError, 'Heavy modules imported at startup: numpy'):
+                call_command('importbudget', '--budget-ms=100000', stdout=StringIO())
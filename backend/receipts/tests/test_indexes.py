@@ -0,0 +1,63 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+
+from receipts.utils.indexes import ReceiptIndex
+
+
+def record(receipt_id, amount, day):
+    return {'id': receipt_id, 'amount': Decimal(amount), 'transaction_date': day}
+
+
+class ReceiptIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = ReceiptIndex.from_records([
+            record('a', '100.00', date(2024, 1, 1)),
+            record('b', '50.00', date(2024, 1, 10)),
+            record('c', '100.00', date(2024, 1, 10)),
+            record('d', '75.25', date(2024, 2, 1)),
+        ])
+
+    def assert_consistent(self):
+        self.assertEqual(self.index._by_amount, sorted(self.index._by_amount))
+        self.assertEqual(self.index._by_date, sorted(self.index._by_date))
+        self.assertEqual(len(self.index._by_amount), len(self.index))
+        self.assertEqual(len(self.index._by_date), len(self.index))
+
+    def test_amount_range_is_inclusive(self):
+        self.assertEqual(self.index.amount_range(50, 75.25), ['b', 'd'])
+        self.assertEqual(self.index.amount_range(100, 100), ['a', 'c'])
+        self.assertEqual(self.index.amount_range(100.01, 500), [])
+
+    def test_date_lookups(self):
+        self.assertEqual(self.index.on_date(date(2024, 1, 10)), ['b', 'c'])
+        self.assertEqual(self.index.date_range(date(2024, 1, 2), date(2024, 2, 1)), ['b', 'c', 'd'])
+
+    def test_nearest_date(self):
+        self.assertEqual(self.index.nearest_date(date(2024, 1, 8)), ['b', 'c'])
+        self.assertEqual(self.index.nearest_date(date(2025, 1, 1)), ['d'])
+        # Jan 4 is three days from both Jan 1 and Jan 7: the earlier date wins
+        self.index.insert(record('e', '1.00', date(2024, 1, 7)))
+        self.assertEqual(self.index.nearest_date(date(2024, 1, 4)), ['a'])
+        self.assertEqual(ReceiptIndex().nearest_date(date(2024, 1, 1)), [])
+
+    def test_insert_replaces_existing_entry(self):
+        self.index.insert(record('a', '60.00', date(2024, 1, 10)))
+        self.assert_consistent()
+        self.assertEqual(len(self.index), 4)
+        self.assertEqual(self.index.amount_range(100, 100), ['c'])
+        self.assertEqual(self.index.on_date(date(2024, 1, 10)), ['a', 'b', 'c'])
+        self.assertEqual(self.index.on_date(date(2024, 1, 1)), [])
+
+    def test_delete(self):
+        self.assertTrue(self.index.delete('c'))
+        self.assertFalse(self.index.delete('c'))
+        self.assert_consistent()
+        self.assertEqual(self.index.amount_range(0, 1000), ['b', 'd', 'a'])
+
+    def test_copy_is_independent(self):
+        snapshot = self.index.copy()
+        self.index.delete('a')
+        self.assertEqual(len(snapshot), 4)
+        self.assertEqual(snapshot.amount_range(100, 100), ['a', 'c'])
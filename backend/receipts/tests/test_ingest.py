@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from receipts.models import Receipt, RejectedFile
+from receipts.storage import content_hash
+
+RECEIPT = 'BIG BAZAAR\n12/03/2024\nTotal: 450.00'
+
+
+class IngestTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.media_root = media.name
+        source = tempfile.TemporaryDirectory()
+        self.addCleanup(source.cleanup)
+        self.source = source.name
+
+    def write(self, name, text):
+        path = os.path.join(self.source, name)
+        with open(path, 'w') as fh:
+            fh.write(text)
+        return path
+
+    def ingest(self, *args):
+        out = StringIO()
+        call_command('ingest', self.source, '--workers=1', *args, stdout=out)
+        return out.getvalue()
+
+    def stored_files(self):
+        return sum(len(files) for _, _, files in os.walk(self.media_root))
+
+    def test_rejected_files_are_remembered_and_skipped(self):
+        self.write('good.txt', RECEIPT)
+        self.write('blank.txt', 'nothing useful here')
+
+        self.ingest()
+        self.assertEqual(Receipt.objects.count(), 1)
+        self.assertEqual(list(RejectedFile.objects.values_list('name', flat=True)), ['blank.txt'])
+        self.assertEqual(self.stored_files(), 1)
+
+        output = self.ingest()
+        self.assertIn('1 duplicates, 0 failed, 1 previously rejected', output)
+
+        output = self.ingest('--retry-rejected')
+        self.assertIn('1 duplicates, 1 failed, 0 previously rejected', output)
+        self.assertEqual(RejectedFile.objects.count(), 1)
+
+    def test_retry_clears_the_rejection_once_the_file_parses(self):
+        path = self.write('late.txt', RECEIPT)
+        RejectedFile.objects.create(content_hash=content_hash(path), name='late.txt')
+
+        self.ingest()
+        self.assertFalse(Receipt.objects.exists())
+
+        self.ingest('--retry-rejected')
+        self.assertEqual(Receipt.objects.count(), 1)
+        self.assertFalse(RejectedFile.objects.exists())
+
+    def test_watch_picks_up_files_moved_in_with_an_old_mtime(self):
+        self.write('first.txt', RECEIPT)
+        staging = tempfile.TemporaryDirectory()
+        self.addCleanup(staging.cleanup)
+        moved = os.path.join(staging.name, 'moved.txt')
+        with open(moved, 'w') as fh:
+            fh.write(RECEIPT.replace('450.00', '99.00'))
+        # Copied with cp -p from an old backup: modified long before the first poll
+        os.utime(moved, (0, 0))
+
+        polls = []
+
+        def sleep(seconds):
+            polls.append(Receipt.objects.count())
+            if len(polls) == 1:
+                shutil.move(moved, os.path.join(self.source, 'moved.txt'))
+            else:
+                raise KeyboardInterrupt
+
+        with mock.patch('receipts.management.commands.ingest.SETTLE_SECONDS', -60), \
+                mock.patch('receipts.management.commands.ingest.time.sleep', sleep):
+            self.ingest('--watch')
+        self.assertEqual(polls, [1, 2])
+        self.assertEqual(
+            sorted(Receipt.objects.values_list('amount', flat=True)), [Decimal('99.00'), Decimal('450.00')]
+        )
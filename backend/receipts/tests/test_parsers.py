@@ -0,0 +1,90 @@
+from django.test import SimpleTestCase
+
+from receipts.utils.extractors import Extractor
+from receipts.utils.parsers import ReceiptParser
+
+
+class FakeExtractor(Extractor):
+    extensions = ('jpg',)
+
+    def __init__(self, name, cost, text=None, error=None, extensions=None):
+        self.name, self.cost, self.text, self.error = name, cost, text, error
+        if extensions is not None:
+            self.extensions = extensions
+        self.calls = 0
+
+    def extract(self, source, extension):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return self.text
+
+
+KNOWN_VENDOR = 'BIG BAZAAR\n12/03/2024\nTotal: 450.00'
+GUESSED_VENDOR = 'Sri Lakshmi Stores\n12/03/2024\nTotal: 450.00'
+NO_AMOUNT = 'B1G B@ZAAR\n12/03/2024'
+UNREADABLE = '12\n4.\n450.00'
+
+
+class ExtractorChainTests(SimpleTestCase):
+    def parse(self, *extractors):
+        return ReceiptParser(extractors=list(extractors)).parse_path('receipt.jpg')
+
+    def test_known_vendor_stops_the_chain(self):
+        low = FakeExtractor('ocr_low', 10, KNOWN_VENDOR)
+        high = FakeExtractor('ocr_high', 100, KNOWN_VENDOR)
+        result = self.parse(high, low)
+        self.assertEqual(result['extraction_stage'], 'ocr_low')
+        self.assertEqual(high.calls, 0)
+
+    def test_guessed_vendor_with_amount_stops_the_chain(self):
+        low = FakeExtractor('ocr_low', 10, GUESSED_VENDOR)
+        high = FakeExtractor('ocr_high', 100, KNOWN_VENDOR)
+        result = self.parse(low, high)
+        self.assertEqual(result['extraction_stage'], 'ocr_low')
+        self.assertEqual(result['vendor'], 'sri lakshmi stores')
+        self.assertEqual(high.calls, 0)
+
+    def test_text_layer_pdf_skips_ocr_for_unlisted_vendor(self):
+        text_layer = FakeExtractor('text_layer', 1, GUESSED_VENDOR, extensions=('pdf',))
+        low = FakeExtractor('ocr_low', 10, KNOWN_VENDOR, extensions=('pdf',))
+        high = FakeExtractor('ocr_high', 100, KNOWN_VENDOR, extensions=('pdf',))
+        result = ReceiptParser(extractors=[high, low, text_layer]).parse_path('receipt.pdf')
+        self.assertEqual(result['extraction_stage'], 'text_layer')
+        self.assertEqual((low.calls, high.calls), (0, 0))
+
+    def test_unreadable_text_escalates(self):
+        low = FakeExtractor('ocr_low', 10, UNREADABLE)
+        high = FakeExtractor('ocr_high', 100, KNOWN_VENDOR)
+        result = self.parse(low, high)
+        self.assertEqual(result['extraction_stage'], 'ocr_high')
+        self.assertEqual(result['vendor'], 'Big Bazaar')
+
+    def test_empty_text_layer_escalates_to_ocr(self):
+        text_layer = FakeExtractor('text_layer', 1, '', extensions=('pdf',))
+        low = FakeExtractor('ocr_low', 10, KNOWN_VENDOR, extensions=('pdf',))
+        result = ReceiptParser(extractors=[text_layer, low]).parse_path('receipt.pdf')
+        self.assertEqual(result['extraction_stage'], 'ocr_low')
+
+    def test_missing_amount_escalates(self):
+        low = FakeExtractor('ocr_low', 10, NO_AMOUNT)
+        high = FakeExtractor('ocr_high', 100, KNOWN_VENDOR)
+        self.assertEqual(self.parse(low, high)['extraction_stage'], 'ocr_high')
+
+    def test_best_result_when_none_is_confident(self):
+        low = FakeExtractor('ocr_low', 10, UNREADABLE)
+        high = FakeExtractor('ocr_high', 100, NO_AMOUNT)
+        result = self.parse(low, high)
+        # An amount outranks a higher vendor confidence without one
+        self.assertEqual(result['extraction_stage'], 'ocr_low')
+        self.assertEqual(high.calls, 1)
+
+    def test_failing_extractor_is_skipped(self):
+        low = FakeExtractor('ocr_low', 10, error=OSError('tesseract not installed'))
+        high = FakeExtractor('ocr_high', 100, KNOWN_VENDOR)
+        self.assertEqual(self.parse(low, high)['extraction_stage'], 'ocr_high')
+
+    def test_all_extractors_failing_gives_failed_result(self):
+        result = self.parse(FakeExtractor('ocr_low', 10, error=OSError('no OCR')))
+        self.assertEqual(result['confidence_score'], 0.0)
+        self.assertEqual(result['raw_text'], 'no OCR')
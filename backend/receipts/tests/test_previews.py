@@ -0,0 +1,65 @@
+import os
+import tempfile
+from unittest import mock
+from urllib.parse import parse_qs
+
+from django.test import SimpleTestCase, override_settings
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from receipts import previews
+from receipts.models import Receipt
+from receipts.serializers import ReceiptListSerializer
+
+
+class PreviewUrlTests(SimpleTestCase):
+    def test_version_is_added_as_a_query_parameter(self):
+        receipt = Receipt(content_hash='abc123')
+        request = Request(APIRequestFactory().get('/api/receipts/'))
+        serializer = ReceiptListSerializer(receipt, context={'request': request})
+        with mock.patch('receipts.serializers.reverse',
+                        return_value='http://testserver/api/receipts/1/preview/?version=2'):
+            url = serializer.get_preview_url(receipt)
+        base, query = url.split('?')
+        self.assertEqual(base, 'http://testserver/api/receipts/1/preview/')
+        self.assertEqual(parse_qs(query), {'version': ['2'], 'v': ['abc123']})
+
+
+class EvictionTests(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.root.cleanup)
+
+    def write(self, name, size, mtime):
+        path = os.path.join(self.root.name, name)
+        with open(path, 'wb') as fh:
+            fh.write(b'x' * size)
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_evicts_least_recently_used_and_skips_temporary_files(self):
+        old = self.write('old.webp', 100, 1000)
+        new = self.write('new.webp', 100, 2000)
+        in_flight = self.write('abc.tmp', 500, 500)
+        with override_settings(PREVIEW_ROOT=self.root.name, PREVIEW_CACHE_MAX_BYTES=150):
+            previews.evict_previews()
+        self.assertFalse(os.path.exists(old))
+        self.assertTrue(os.path.exists(new))
+        self.assertTrue(os.path.exists(in_flight))
+
+    def test_sweeps_are_throttled(self):
+        with override_settings(PREVIEW_EVICTION_INTERVAL=60), \
+                mock.patch.object(previews, '_last_eviction', None), \
+                mock.patch.object(previews, 'evict_previews') as evict:
+            previews.maybe_evict_previews()
+            previews.maybe_evict_previews()
+        self.assertEqual(evict.call_count, 1)
+
+
+class WarmPreviewTests(SimpleTestCase):
+    def test_failures_are_logged(self):
+        receipt = Receipt(content_hash='abc123')
+        with mock.patch.object(previews, 'get_preview', side_effect=OSError('bad file')), \
+                self.assertLogs('receipts.previews', 'ERROR') as logs:
+            previews._warm(receipt)
+        self.assertIn(str(receipt.pk), logs.output[0])
@@ -0,0 +1,63 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+
+from receipts.cache import receipt_table_cache
+from receipts.models import Receipt
+
+
+class SearchTests(TestCase):
+    url = '/api/receipts/search/'
+
+    def setUp(self):
+        receipt_table_cache.invalidate()
+        for vendor, day, amount in (
+            ('Big Bazaar', date(2024, 1, 1), '120.00'),
+            ('Big Bazaar', date(2024, 1, 9), '80.00'),
+            ('Indian Oil', date(2024, 1, 20), '1500.00'),
+        ):
+            Receipt.objects.create(
+                file=f'receipts/{vendor}-{day}.txt', vendor=vendor,
+                transaction_date=day, amount=Decimal(amount), category='groceries'
+            )
+
+    def tearDown(self):
+        receipt_table_cache.invalidate()
+
+    def vendors(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return sorted((r['vendor'], str(r['transaction_date'])) for r in response.json()['results'])
+
+    def test_invalid_parameters_are_rejected(self):
+        for params in ({'type': 'date'}, {'type': 'date', 'date': '2024-13-01'},
+                       {'type': 'range', 'min': 'abc'}, {'type': 'range', 'max': 'NaN'}):
+            for extra in ({}, {'vendor': 'Big'}):
+                response = self.client.get(self.url, {**params, **extra})
+                self.assertEqual(response.status_code, 400, params)
+
+    def test_date_search_with_and_without_index(self):
+        # A vendor filter bypasses the cached index; both paths must agree
+        for extra in ({}, {'vendor': 'Big'}):
+            self.assertEqual(
+                self.vendors(type='date', date='2024-01-09', **extra),
+                [('Big Bazaar', '2024-01-09')]
+            )
+            self.assertEqual(self.vendors(type='date', date='2024-01-06', **extra), [])
+            self.assertEqual(
+                self.vendors(type='date', date='2024-01-06', nearest='true', **extra),
+                [('Big Bazaar', '2024-01-09')]
+            )
+            # Jan 5 is four days from Jan 1 and Jan 9: the earlier date wins
+            self.assertEqual(
+                self.vendors(type='date', date='2024-01-05', nearest='true', **extra),
+                [('Big Bazaar', '2024-01-01')]
+            )
+
+    def test_range_search_with_and_without_index(self):
+        for extra in ({}, {'vendor': 'Big'}):
+            self.assertEqual(
+                self.vendors(type='range', min='80', max='120', **extra),
+                [('Big Bazaar', '2024-01-01'), ('Big Bazaar', '2024-01-09')]
+            )
@@ -0,0 +1,112 @@
+import random
+from collections import Counter
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from receipts.utils.sketches import HyperLogLog, CountMinSketch, TDigest
+
+
+class HyperLogLogTests(SimpleTestCase):
+    def test_count_within_error_bound(self):
+        for distinct in (100, 5000, 50000):
+            hll = HyperLogLog()
+            for i in range(distinct):
+                hll.add(f'vendor-{i}')
+                hll.add(f'vendor-{i}')
+            # Three standard errors
+            self.assertLess(abs(hll.count() - distinct) / distinct, 3 * hll.relative_error, distinct)
+
+    def test_merge_is_union(self):
+        first, second = HyperLogLog(), HyperLogLog()
+        for i in range(3000):
+            first.add(f'vendor-{i}')
+            second.add(f'vendor-{i + 1500}')
+        first.merge(second)
+        self.assertLess(abs(first.count() - 4500) / 4500, 3 * first.relative_error)
+
+    def test_round_trip(self):
+        hll = HyperLogLog()
+        for i in range(1000):
+            hll.add(str(i))
+        self.assertEqual(HyperLogLog(registers=hll.to_bytes()).count(), hll.count())
+
+    def test_merge_without_numpy(self):
+        first, second = HyperLogLog(), HyperLogLog()
+        for i in range(3000):
+            first.add(f'vendor-{i}')
+            second.add(f'vendor-{i + 1500}')
+        plain = HyperLogLog(registers=first.to_bytes())
+        first.merge(second)
+        with mock.patch('receipts.utils.sketches.numpy', return_value=None):
+            plain.merge(second)
+        self.assertEqual(plain.to_bytes(), first.to_bytes())
+
+
+class CountMinSketchTests(SimpleTestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        # Skewed stream: a few heavy vendors and a long tail
+        self.counts = Counter(f'vendor-{int(rng.paretovariate(1.2))}' for _ in range(20000))
+        self.sketch = CountMinSketch(width=256, depth=4)
+        for key, count in self.counts.items():
+            self.sketch.add(key, count)
+
+    def test_never_under_counts(self):
+        for key, count in self.counts.items():
+            self.assertGreaterEqual(self.sketch.estimate(key), count)
+
+    def test_over_count_within_error_bound(self):
+        over = [self.sketch.estimate(key) - count for key, count in self.counts.items()]
+        within = sum(1 for error in over if error <= self.sketch.error_bound)
+        self.assertGreaterEqual(within / len(over), self.sketch.confidence)
+
+    def test_merge_adds_counts(self):
+        other = CountMinSketch(width=256, depth=4)
+        other.add('vendor-1', 5)
+        expected = self.sketch.estimate('vendor-1') + 5
+        self.sketch.merge(other)
+        self.assertGreaterEqual(self.sketch.estimate('vendor-1'), self.counts['vendor-1'] + 5)
+        self.assertLessEqual(self.sketch.estimate('vendor-1'), expected)
+        self.assertEqual(self.sketch.total, sum(self.counts.values()) + 5)
+
+    def test_merge_without_numpy(self):
+        plain = CountMinSketch(width=256, depth=4, counters=self.sketch.to_bytes())
+        self.sketch.merge(self.sketch)
+        with mock.patch('receipts.utils.sketches.numpy', return_value=None):
+            plain.merge(plain)
+        self.assertEqual(plain.to_bytes(), self.sketch.to_bytes())
+
+
+class TDigestTests(SimpleTestCase):
+    def test_quantiles_close_to_exact(self):
+        rng = random.Random(11)
+        values = [rng.lognormvariate(6, 1) for _ in range(20000)]
+        digest = TDigest()
+        for value in values:
+            digest.add(value)
+
+        ordered = sorted(values)
+        for q in (0.01, 0.1, 0.5, 0.9, 0.99):
+            estimate = digest.quantile(q)
+            # Compare by rank: the estimate must fall near the q-th position
+            rank = sum(1 for value in ordered if value <= estimate) / len(ordered)
+            self.assertLess(abs(rank - q), 0.01, q)
+
+    def test_merge_matches_single_digest(self):
+        rng = random.Random(3)
+        values = [rng.uniform(0, 1000) for _ in range(10000)]
+        first, second = TDigest(), TDigest()
+        for value in values[:5000]:
+            first.add(value)
+        for value in values[5000:]:
+            second.add(value)
+        first.merge(second)
+        self.assertEqual(first.count, len(values))
+        self.assertAlmostEqual(first.quantile(0.5), 500, delta=20)
+
+    def test_empty_and_single_value(self):
+        digest = TDigest()
+        self.assertIsNone(digest.quantile(0.5))
+        digest.add(42.0)
+        self.assertEqual(digest.quantile(0.9), 42.0)
@@ -0,0 +1,62 @@
+import os
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from django.test import TestCase, override_settings
+
+from receipts.models import Receipt
+from receipts.storage import spool_upload, discard_upload
+from receipts.utils.parsers import ReceiptParser
+
+RECEIPT = b'BIG BAZAAR\n12/03/2024\nTotal: 450.00'
+
+
+class UploadStorageTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.media_root = media.name
+
+    def stored_files(self):
+        return [name for _, _, files in os.walk(self.media_root) for name in files]
+
+    def test_spooled_upload_is_moved_not_copied(self):
+        upload = TemporaryUploadedFile('receipt.txt', 'text/plain', len(RECEIPT), None)
+        upload.write(RECEIPT)
+        upload.flush()
+        temporary_path = upload.temporary_file_path()
+
+        name, path = spool_upload(upload)
+        upload.close()
+        self.assertFalse(os.path.exists(temporary_path))
+        self.assertEqual(path, os.path.join(self.media_root, name))
+        with open(path, 'rb') as fh:
+            self.assertEqual(fh.read(), RECEIPT)
+
+    def test_parse_path_reads_the_stored_file(self):
+        _, path = spool_upload(SimpleUploadedFile('receipt.txt', RECEIPT))
+        parsed = ReceiptParser().parse_path(path)
+        self.assertEqual(parsed['vendor'], 'Big Bazaar')
+        self.assertEqual(parsed['amount'], 450.0)
+
+    def test_discard_upload_removes_the_file(self):
+        name, _ = spool_upload(SimpleUploadedFile('receipt.txt', RECEIPT))
+        discard_upload(name)
+        self.assertEqual(self.stored_files(), [])
+
+    def test_upload_keeps_the_file_of_a_valid_receipt(self):
+        response = self.client.post('/api/receipts/upload/', {
+            'file': SimpleUploadedFile('receipt.txt', RECEIPT, content_type='text/plain')
+        })
+        self.assertEqual(response.status_code, 201)
+        receipt = Receipt.objects.get()
+        self.assertEqual(self.stored_files(), [os.path.basename(receipt.file.name)])
+
+    def test_upload_removes_the_file_when_validation_fails(self):
+        response = self.client.post('/api/receipts/upload/', {
+            'file': SimpleUploadedFile('blank.txt', b'nothing useful here', content_type='text/plain')
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Receipt.objects.exists())
+        self.assertEqual(self.stored_files(), [])
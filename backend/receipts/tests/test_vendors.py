@@ -0,0 +1,34 @@
+from datetime import date
+
+from django.test import TestCase
+
+from receipts.cache import receipt_table_cache
+from receipts.models import Receipt
+
+
+class VendorSuggestionTests(TestCase):
+    url = '/api/receipts/vendors/'
+
+    def setUp(self):
+        receipt_table_cache.invalidate()
+        self.addCleanup(receipt_table_cache.invalidate)
+        for vendor in ('Big Bazaar', 'Big Basket', 'Bigg Boss Cafe'):
+            Receipt.objects.create(
+                file='receipts/r.txt', vendor=vendor, transaction_date=date(2024, 1, 1), amount=10
+            )
+
+    def results(self, **params):
+        response = self.client.get(self.url, {'q': 'big', **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results']
+
+    def test_limit_is_clamped(self):
+        self.assertEqual(len(self.results(limit=0)), 1)
+        self.assertEqual(len(self.results(limit=-5)), 1)
+        self.assertEqual(len(self.results(limit=2)), 2)
+        self.assertEqual(len(self.results(limit=1000)), 3)
+
+    def test_non_integer_limit_is_rejected(self):
+        for limit in ('abc', '2.5', ''):
+            response = self.client.get(self.url, {'q': 'big', 'limit': limit})
+            self.assertEqual(response.status_code, 400, limit)
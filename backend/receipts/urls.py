@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from . import views
@@ -5,7 +6,18 @@ from . import views
 router = DefaultRouter()
 router.register(r'receipts', views.ReceiptViewSet)
 
-urlpatterns = [
+urlpatterns = []
+
+if settings.ASYNC_VIEWS:
+    from . import async_views
+
+    # Shadow the viewset's hot actions with their async versions
+    urlpatterns += [
+        path('api/receipts/upload/', async_views.upload_receipt),
+        path('api/receipts/analytics/', async_views.receipt_analytics),
+        path('api/receipts/events/', async_views.receipt_event_stream),
+    ]
+
+urlpatterns += [
     path('api/', include(router.urls)),
 ]
-
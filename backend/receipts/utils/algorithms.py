@@ -98,12 +98,17 @@ class ReceiptAnalytics:
             return {}
         
         amounts = [float(receipt['amount']) for receipt in receipts]
+        # Ties go to the smallest value, so the result does not depend on row order
+        frequencies = Counter(amounts)
+        top_frequency = max(frequencies.values())
         
         return {
             'total_spend': sum(amounts),
             'mean_spend': statistics.mean(amounts),
             'median_spend': statistics.median(amounts),
-            'mode_spend': statistics.mode(amounts) if len(set(amounts)) < len(amounts) else None,
+            'mode_spend': min(
+                value for value, count in frequencies.items() if count == top_frequency
+            ) if top_frequency > 1 else None,
             'min_spend': min(amounts),
             'max_spend': max(amounts),
             'std_deviation': statistics.stdev(amounts) if len(amounts) > 1 else 0,
@@ -0,0 +1,405 @@
+from array import array
+from collections import Counter
+from datetime import date
+from decimal import Decimal
+from functools import lru_cache
+from typing import List, Dict, Any, Iterable, Optional
+import heapq
+import math
+
+
+@lru_cache(maxsize=None)
+def numpy():
+    """NumPy, imported on first analytics use, or None when not installed"""
+    try:
+        import numpy
+    except ImportError:  # NumPy is optional, plain arrays are used without it
+        return None
+    return numpy
+
+
+def to_paise(amount) -> int:
+    """Convert a rupee amount (Decimal, float or str) to integer paise"""
+    return int((Decimal(str(amount)) * 100).to_integral_value())
+
+
+def from_paise(paise: int) -> Decimal:
+    """Convert integer paise back to a 2-decimal rupee amount"""
+    return Decimal(paise).scaleb(-2)
+
+
+class ReceiptTable:
+    """Columnar in-memory store of receipts for analytics
+
+    Each receipt is one row across parallel typed arrays: amounts in paise
+    (``array('q')``), dates as ordinals (``array('i')``) and dictionary-encoded
+    vendor/category codes. A row costs ~20 bytes instead of a dict of
+    ``Decimal`` and ``date`` objects.
+    """
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.amounts = array('q')
+        self.dates = array('i')
+        self.vendor_codes = array('i')
+        self.category_codes = array('i')
+        self.vendors: List[str] = []
+        self.categories: List[str] = []
+        self._vendor_lookup: Dict[str, int] = {}
+        self._category_lookup: Dict[str, int] = {}
+        self._row_by_id: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, receipt_id) -> bool:
+        return str(receipt_id) in self._row_by_id
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict]) -> 'ReceiptTable':
+        """Build a table from dicts with id, vendor, transaction_date, amount, category"""
+        table = cls()
+        for record in records:
+            table.upsert(record)
+        return table
+
+    @staticmethod
+    def _encode(value: str, values: List[str], lookup: Dict[str, int]) -> int:
+        code = lookup.get(value)
+        if code is None:
+            code = len(values)
+            values.append(value)
+            lookup[value] = code
+        return code
+
+    def upsert(self, record: Dict) -> None:
+        """Insert a receipt, or overwrite its row if the id is already present"""
+        receipt_id = str(record['id'])
+        amount = to_paise(record['amount'])
+        ordinal = record['transaction_date'].toordinal()
+        vendor = self._encode(record['vendor'], self.vendors, self._vendor_lookup)
+        category = self._encode(record['category'], self.categories, self._category_lookup)
+
+        row = self._row_by_id.get(receipt_id)
+        if row is None:
+            self._row_by_id[receipt_id] = len(self.ids)
+            self.ids.append(receipt_id)
+            self.amounts.append(amount)
+            self.dates.append(ordinal)
+            self.vendor_codes.append(vendor)
+            self.category_codes.append(category)
+        else:
+            self.amounts[row] = amount
+            self.dates[row] = ordinal
+            self.vendor_codes[row] = vendor
+            self.category_codes[row] = category
+
+    def remove(self, receipt_id) -> bool:
+        """Delete a receipt by swapping the last row into its slot - O(1)"""
+        row = self._row_by_id.pop(str(receipt_id), None)
+        if row is None:
+            return False
+
+        last = len(self.ids) - 1
+        if row != last:
+            moved_id = self.ids[last]
+            self.ids[row] = moved_id
+            self.amounts[row] = self.amounts[last]
+            self.dates[row] = self.dates[last]
+            self.vendor_codes[row] = self.vendor_codes[last]
+            self.category_codes[row] = self.category_codes[last]
+            self._row_by_id[moved_id] = row
+
+        self.ids.pop()
+        self.amounts.pop()
+        self.dates.pop()
+        self.vendor_codes.pop()
+        self.category_codes.pop()
+        return True
+
+    def filter(self, category: Optional[str] = None,
+               min_amount=None, max_amount=None,
+               start_date: Optional[date] = None,
+               end_date: Optional[date] = None) -> 'ReceiptTable':
+        """Return a new table holding only the matching rows"""
+        np = numpy()
+        bounds = [
+            (self.category_codes, '==', self._category_lookup.get(category, -1)
+             if category is not None else None),
+            (self.amounts, '>=', to_paise(min_amount) if min_amount is not None else None),
+            (self.amounts, '<=', to_paise(max_amount) if max_amount is not None else None),
+            (self.dates, '>=', start_date.toordinal() if start_date is not None else None),
+            (self.dates, '<=', end_date.toordinal() if end_date is not None else None),
+        ]
+        bounds = [bound for bound in bounds if bound[2] is not None]
+        if not bounds or not len(self):
+            return self
+
+        if np is not None:
+            mask = np.ones(len(self), dtype=bool)
+            for column, op, value in bounds:
+                values = np.frombuffer(column, dtype=np.int64 if column.typecode == 'q' else np.int32)
+                if op == '==':
+                    mask &= values == value
+                elif op == '>=':
+                    mask &= values >= value
+                else:
+                    mask &= values <= value
+            return self.take(np.flatnonzero(mask))
+
+        rows = range(len(self))
+        for column, op, value in bounds:
+            if op == '==':
+                rows = [i for i in rows if column[i] == value]
+            elif op == '>=':
+                rows = [i for i in rows if column[i] >= value]
+            else:
+                rows = [i for i in rows if column[i] <= value]
+        return self.take(rows)
+
+    def take(self, rows) -> 'ReceiptTable':
+        """Return a new table with the given rows, sharing the dictionaries"""
+        np = numpy()
+        subset = ReceiptTable()
+        subset.vendors = self.vendors
+        subset.categories = self.categories
+        subset._vendor_lookup = self._vendor_lookup
+        subset._category_lookup = self._category_lookup
+
+        if np is not None and len(self):
+            index = np.asarray(rows, dtype=np.intp)
+            for name in ('amounts', 'dates', 'vendor_codes', 'category_codes'):
+                column = getattr(self, name)
+                values = np.frombuffer(column, dtype=np.int64 if column.typecode == 'q' else np.int32)
+                getattr(subset, name).frombytes(values[index].tobytes())
+            subset.ids = [self.ids[row] for row in index.tolist()]
+        else:
+            for row in rows:
+                subset.ids.append(self.ids[row])
+                subset.amounts.append(self.amounts[row])
+                subset.dates.append(self.dates[row])
+                subset.vendor_codes.append(self.vendor_codes[row])
+                subset.category_codes.append(self.category_codes[row])
+
+        subset._row_by_id = {receipt_id: row for row, receipt_id in enumerate(subset.ids)}
+        return subset
+
+    def copy(self) -> 'ReceiptTable':
+        """Snapshot the columns so the original can keep being updated"""
+        snapshot = ReceiptTable()
+        snapshot.ids = list(self.ids)
+        snapshot.amounts = array('q', self.amounts)
+        snapshot.dates = array('i', self.dates)
+        snapshot.vendor_codes = array('i', self.vendor_codes)
+        snapshot.category_codes = array('i', self.category_codes)
+        snapshot.vendors = list(self.vendors)
+        snapshot.categories = list(self.categories)
+        snapshot._vendor_lookup = dict(self._vendor_lookup)
+        snapshot._category_lookup = dict(self._category_lookup)
+        snapshot._row_by_id = dict(self._row_by_id)
+        return snapshot
+
+    def record(self, row: int, with_id: bool = True) -> Dict[str, Any]:
+        """Materialize one row as the dict shape used by ``ReceiptAnalytics``"""
+        record = {
+            'vendor': self.vendors[self.vendor_codes[row]],
+            'transaction_date': date.fromordinal(self.dates[row]),
+            'amount': from_paise(self.amounts[row]),
+            'category': self.categories[self.category_codes[row]],
+        }
+        if with_id:
+            record = {'id': self.ids[row], **record}
+        return record
+
+    def records(self, rows: Optional[Iterable[int]] = None, with_id: bool = True) -> List[Dict[str, Any]]:
+        if rows is None:
+            rows = range(len(self))
+        return [self.record(row, with_id) for row in rows]
+
+    def vendor_of(self, receipt_id) -> Optional[str]:
+        """Vendor of a stored receipt, or None if it is not in the table"""
+        row = self._row_by_id.get(str(receipt_id))
+        return None if row is None else self.vendors[self.vendor_codes[row]]
+
+    def records_for_ids(self, receipt_ids: Iterable[str]) -> List[Dict[str, Any]]:
+        """Materialize rows by receipt id, skipping unknown ids"""
+        rows = (self._row_by_id.get(str(receipt_id)) for receipt_id in receipt_ids)
+        return self.records(row for row in rows if row is not None)
+
+    def numpy_views(self) -> Optional[Dict[str, Any]]:
+        """Zero-copy NumPy views over the columns, or None without NumPy"""
+        np = numpy()
+        if np is None or not len(self):
+            return None
+        return {
+            'amounts': np.frombuffer(self.amounts, dtype=np.int64),
+            'dates': np.frombuffer(self.dates, dtype=np.int32),
+            'vendor_codes': np.frombuffer(self.vendor_codes, dtype=np.int32),
+            'category_codes': np.frombuffer(self.category_codes, dtype=np.int32),
+        }
+
+    def nbytes(self) -> int:
+        """Approximate size of the column buffers in bytes"""
+        columns = (self.amounts, self.dates, self.vendor_codes, self.category_codes)
+        return sum(column.itemsize * len(column) for column in columns)
+
+
+class ColumnarAnalytics:
+    """``ReceiptAnalytics`` equivalents that operate on a ``ReceiptTable``
+
+    Results have the same shape as the list-of-dicts implementations. Sums
+    are computed in integer paise and vectorized with NumPy when available.
+    """
+
+    @staticmethod
+    def compute_statistics(table: ReceiptTable) -> Dict[str, Any]:
+        """Compute statistical aggregates"""
+        np = numpy()
+        n = len(table)
+        if not n:
+            return {}
+
+        views = table.numpy_views()
+        if views is not None:
+            amounts = views['amounts']
+            # np.unique sorts, so argmax picks the smallest of tied values
+            values, counts = np.unique(amounts, return_counts=True)
+            mode = values[counts.argmax()] if counts.max() > 1 else None
+            return {
+                'total_spend': int(amounts.sum()) / 100,
+                'mean_spend': float(amounts.mean()) / 100,
+                'median_spend': float(np.median(amounts)) / 100,
+                'mode_spend': int(mode) / 100 if mode is not None else None,
+                'min_spend': int(amounts.min()) / 100,
+                'max_spend': int(amounts.max()) / 100,
+                'std_deviation': float(amounts.std(ddof=1)) / 100 if n > 1 else 0,
+                'count': n
+            }
+
+        amounts = sorted(table.amounts)
+        total = sum(amounts)
+        mean = total / n
+        mid = n // 2
+        median = amounts[mid] if n % 2 else (amounts[mid - 1] + amounts[mid]) / 2
+        counts = Counter(table.amounts)
+        frequency = max(counts.values())
+        value = min(amount for amount, count in counts.items() if count == frequency)
+        variance = sum((a - mean) ** 2 for a in amounts) / (n - 1) if n > 1 else 0
+        return {
+            'total_spend': total / 100,
+            'mean_spend': mean / 100,
+            'median_spend': median / 100,
+            'mode_spend': value / 100 if frequency > 1 else None,
+            'min_spend': amounts[0] / 100,
+            'max_spend': amounts[-1] / 100,
+            'std_deviation': math.sqrt(variance) / 100,
+            'count': n
+        }
+
+    @staticmethod
+    def _vendor_sums(table: ReceiptTable):
+        """Per-vendor-code (counts, paise totals) lists"""
+        np = numpy()
+        size = len(table.vendors)
+        views = table.numpy_views()
+        if views is not None:
+            codes = views['vendor_codes']
+            counts = np.bincount(codes, minlength=size)
+            totals = np.bincount(codes, weights=views['amounts'], minlength=size)
+            return counts.tolist(), totals.tolist()
+
+        counts = [0] * size
+        totals = [0] * size
+        for code, amount in zip(table.vendor_codes, table.amounts):
+            counts[code] += 1
+            totals[code] += amount
+        return counts, totals
+
+    @staticmethod
+    def vendor_frequency_analysis(table: ReceiptTable) -> Dict[str, int]:
+        """Frequency distribution of vendors"""
+        counts, _ = ColumnarAnalytics._vendor_sums(table)
+        ranked = sorted(
+            (code for code, count in enumerate(counts) if count),
+            key=lambda code: -counts[code]
+        )
+        return {table.vendors[code]: int(counts[code]) for code in ranked}
+
+    @staticmethod
+    def top_k_vendors(table: ReceiptTable, k: int = 10) -> List[Dict]:
+        """Top K vendors by spending - O(n + v log k)"""
+        counts, totals = ColumnarAnalytics._vendor_sums(table)
+        top = heapq.nlargest(
+            k,
+            (code for code, count in enumerate(counts) if count),
+            key=lambda code: totals[code]
+        )
+        return [
+            {'vendor': table.vendors[code], 'total_spend': totals[code] / 100}
+            for code in top
+        ]
+
+    @staticmethod
+    def category_distribution(table: ReceiptTable) -> Dict[str, Dict]:
+        """Category-wise spending analysis"""
+        rows_by_category: Dict[int, List[int]] = {}
+        for row, code in enumerate(table.category_codes):
+            rows_by_category.setdefault(code, []).append(row)
+
+        result = {}
+        for code, rows in rows_by_category.items():
+            result[table.categories[code]] = {
+                'count': len(rows),
+                'total': sum(table.amounts[row] for row in rows) / 100,
+                # Same keys as the ORM path, which selects no id
+                'receipts': table.records(rows, with_id=False),
+            }
+        return result
+
+    @staticmethod
+    def time_series_analysis(table: ReceiptTable, window_days: int = 30) -> Dict[str, List]:
+        """Time-series analysis with moving averages"""
+        np = numpy()
+        if not len(table):
+            return {'dates': [], 'amounts': [], 'moving_avg': []}
+
+        views = table.numpy_views()
+        if views is not None:
+            ordinals, inverse = np.unique(views['dates'], return_inverse=True)
+            daily = np.bincount(inverse, weights=views['amounts']) / 100
+            prefix = np.concatenate(([0.0], np.cumsum(daily)))
+            ends = np.arange(1, len(daily) + 1)
+            starts = np.maximum(0, ends - window_days)
+            moving = (prefix[ends] - prefix[starts]) / (ends - starts)
+            ordinals, amounts, moving = ordinals.tolist(), daily.tolist(), moving.tolist()
+        else:
+            daily_totals: Dict[int, int] = {}
+            for ordinal, amount in zip(table.dates, table.amounts):
+                daily_totals[ordinal] = daily_totals.get(ordinal, 0) + amount
+            ordinals = sorted(daily_totals)
+            amounts = [daily_totals[o] / 100 for o in ordinals]
+            moving, running = [], 0.0
+            for i, amount in enumerate(amounts):
+                running += amount
+                if i >= window_days:
+                    running -= amounts[i - window_days]
+                moving.append(running / min(i + 1, window_days))
+
+        return {
+            'dates': [date.fromordinal(o).isoformat() for o in ordinals],
+            'amounts': amounts,
+            'moving_avg': moving
+        }
+
+    @staticmethod
+    def range_search(table: ReceiptTable, min_amount: float, max_amount: float) -> List[Dict]:
+        """Search receipts within amount range"""
+        np = numpy()
+        low, high = to_paise(min_amount), to_paise(max_amount)
+        views = table.numpy_views()
+        if views is not None:
+            amounts = views['amounts']
+            rows = np.flatnonzero((amounts >= low) & (amounts <= high)).tolist()
+        else:
+            rows = [i for i, amount in enumerate(table.amounts) if low <= amount <= high]
+        return table.records(rows)
@@ -0,0 +1,68 @@
+from collections import Counter
+from typing import List, Optional
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional, zlib is always available
+    zstandard = None
+
+# zlib preset dictionaries are limited to the 32KB deflate window
+ZLIB_DICTIONARY_SIZE = 32 * 1024
+
+
+def available_codecs() -> List[str]:
+    return ['zlib', 'zstd'] if zstandard is not None else ['zlib']
+
+
+def compress_text(text: str, codec: str = 'zlib', dictionary: Optional[bytes] = None) -> bytes:
+    """Compress UTF-8 text, optionally against a trained dictionary"""
+    data = text.encode('utf-8')
+    if codec == 'zstd':
+        params = {'level': 19}
+        if dictionary:
+            params['dict_data'] = zstandard.ZstdCompressionDict(dictionary)
+        return zstandard.ZstdCompressor(**params).compress(data)
+
+    compressor = zlib.compressobj(9, zdict=dictionary) if dictionary else zlib.compressobj(9)
+    return compressor.compress(data) + compressor.flush()
+
+
+def decompress_text(data: bytes, codec: str = 'zlib', dictionary: Optional[bytes] = None) -> str:
+    if codec == 'zstd':
+        params = {}
+        if dictionary:
+            params['dict_data'] = zstandard.ZstdCompressionDict(dictionary)
+        return zstandard.ZstdDecompressor(**params).decompress(data).decode('utf-8')
+
+    decompressor = zlib.decompressobj(zdict=dictionary) if dictionary else zlib.decompressobj()
+    return (decompressor.decompress(data) + decompressor.flush()).decode('utf-8')
+
+
+def train_dictionary(samples: List[str], codec: str = 'zlib',
+                     size: int = ZLIB_DICTIONARY_SIZE) -> bytes:
+    """Build a shared dictionary from sample receipts
+
+    zstd uses its own trainer. For zlib the dictionary is the most common
+    lines across the samples, most frequent last, because deflate matches
+    recent dictionary bytes most cheaply.
+    """
+    if codec == 'zstd':
+        encoded = [sample.encode('utf-8') for sample in samples]
+        return zstandard.train_dictionary(size, encoded).as_bytes()
+
+    size = min(size, ZLIB_DICTIONARY_SIZE)
+    lines = Counter()
+    for sample in samples:
+        lines.update(set(line.strip() for line in sample.splitlines() if line.strip()))
+
+    chosen, total = [], 0
+    for line, count in lines.most_common():
+        if count < 2:
+            break
+        encoded = (line + '\n').encode('utf-8')
+        if total + len(encoded) > size:
+            break
+        chosen.append(encoded)
+        total += len(encoded)
+    return b''.join(reversed(chosen))
@@ -0,0 +1,130 @@
+from functools import lru_cache
+from typing import List, Optional, Tuple
+import importlib
+import io
+import mmap
+import os
+
+# Extraction backends by role. They are heavy, so each is imported on first
+# use by a matching file type and then cached, keeping worker startup and
+# non-upload traffic free of PDF/imaging/OCR imports.
+EXTRACTION_BACKENDS = {
+    'pdf': 'PyPDF2',
+    'image': 'PIL.Image',
+    'ocr': 'pytesseract',
+}
+
+IMAGE_EXTENSIONS = ('jpg', 'jpeg', 'png')
+
+
+@lru_cache(maxsize=None)
+def load_backend(role: str):
+    """Import and cache the extraction backend module for a role"""
+    return importlib.import_module(EXTRACTION_BACKENDS[role])
+
+
+class Extractor:
+    """One way of getting text out of a receipt file
+
+    ``ReceiptParser`` tries the extractors that support a file type in
+    order of ``cost`` and stops at the first confident result.
+    """
+    name = ''
+    cost = 0
+    extensions: Tuple[str, ...] = ()
+
+    def supports(self, extension: str) -> bool:
+        return extension in self.extensions
+
+    def extract(self, source, extension: str) -> str:
+        """Return the text of ``source``, a path or a seekable file object"""
+        raise NotImplementedError
+
+
+class TextLayerExtractor(Extractor):
+    """Embedded text: plain-text receipts and PDFs with a text layer
+
+    Files on disk are memory-mapped, so they are never copied into a Python
+    bytes object before extraction.
+    """
+    name = 'text_layer'
+    cost = 1
+    extensions = ('txt', 'pdf')
+
+    def extract(self, source, extension: str) -> str:
+        if not isinstance(source, (str, os.PathLike)):
+            return self._extract(source.read(), extension)
+
+        with open(source, 'rb') as fh:
+            if os.fstat(fh.fileno()).st_size == 0:
+                return ''
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return self._extract(mapped, extension)
+
+    def _extract(self, data, extension: str) -> str:
+        if extension == 'txt':
+            return str(data, 'utf-8')
+
+        if isinstance(data, bytes):
+            data = io.BytesIO(data)
+        reader = load_backend('pdf').PdfReader(data)
+        return ''.join((page.extract_text() or '') + '\n' for page in reader.pages)
+
+
+class OcrExtractor(Extractor):
+    """Tesseract OCR over photos and rasterized PDF pages
+
+    ``max_side`` caps the longest image side in pixels; OCR time grows with
+    pixel count, so a downscaled pass is tried before the full-size one.
+    """
+    extensions = IMAGE_EXTENSIONS + ('pdf',)
+
+    def __init__(self, name: str, cost: int, max_side: Optional[int] = None):
+        self.name = name
+        self.cost = cost
+        self.max_side = max_side
+
+    def extract(self, source, extension: str) -> str:
+        ocr = load_backend('ocr')
+        pages = self._pdf_pages(source) if extension == 'pdf' else [load_backend('image').open(source)]
+        return '\n'.join(ocr.image_to_string(self._prepare(page)) for page in pages)
+
+    def _prepare(self, image):
+        if self.max_side is not None:
+            image.draft('L', (self.max_side, self.max_side))  # Decode JPEGs at reduced size
+        if self.max_side is not None and max(image.size) > self.max_side:
+            image = image.copy()
+            image.thumbnail((self.max_side, self.max_side))
+        return image.convert('L')
+
+    def _pdf_pages(self, source) -> List:
+        """Page images: rendered with pypdfium2 if installed, else the
+        largest embedded image of each page (scans are one image per page)"""
+        try:
+            import pypdfium2
+        except ImportError:
+            pypdfium2 = None
+
+        if pypdfium2 is not None:
+            document = pypdfium2.PdfDocument(source)
+            try:
+                # 300 dpi at full size; max_side downscales afterwards
+                return [page.render(scale=300 / 72).to_pil() for page in document]
+            finally:
+                document.close()
+
+        images = []
+        for page in load_backend('pdf').PdfReader(source).pages:
+            embedded = getattr(page, 'images', [])
+            if embedded:
+                largest = max(embedded, key=lambda item: len(item.data))
+                images.append(load_backend('image').open(io.BytesIO(largest.data)))
+        return images
+
+
+# Cheapest first. Register extra extractors here to extend the chain.
+DEFAULT_EXTRACTORS = [
+    TextLayerExtractor(),
+    OcrExtractor('ocr_low', cost=10, max_side=1200),
+    OcrExtractor('ocr_high', cost=100),
+]
@@ -0,0 +1,41 @@
+import re
+
+from .sketches import hash64
+from .trigrams import trigrams
+
+NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+
+# Legal suffixes that differ between an e-mailed invoice and a till slip
+VENDOR_SUFFIXES = ('privatelimited', 'pvtltd', 'limited', 'ltd', 'llp', 'inc')
+
+
+def normalize_vendor(vendor: str) -> str:
+    """Blocking key for a vendor name: lowercase alphanumerics, no legal suffix"""
+    key = NON_ALNUM_RE.sub('', vendor.lower())
+    for suffix in VENDOR_SUFFIXES:
+        if key.endswith(suffix) and len(key) > len(suffix):
+            return key[:-len(suffix)]
+    return key
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash over character trigrams, as a signed integer for the DB
+
+    Similar texts get fingerprints a small Hamming distance apart. Trigrams
+    tolerate the character-level noise OCR introduces. Empty text gives 0.
+    """
+    weights = [0] * 64
+    features = trigrams(text)
+    if not features:
+        return 0
+    for feature in features:
+        h = hash64(feature)
+        for bit in range(64):
+            weights[bit] += 1 if h >> bit & 1 else -1
+
+    value = sum(1 << bit for bit in range(64) if weights[bit] > 0)
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def hamming(a: int, b: int) -> int:
+    return bin((a ^ b) & ((1 << 64) - 1)).count('1')
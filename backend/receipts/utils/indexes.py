@@ -0,0 +1,97 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+from typing import List, Dict, Iterable, Tuple
+
+from .columnar import to_paise
+
+
+class ReceiptIndex:
+    """Receipt ids kept sorted by amount and by date
+
+    Insert and delete use ``bisect`` so the index stays current without
+    re-sorting. Lookups are O(log n + k) for k results.
+    """
+
+    def __init__(self):
+        self._by_amount: List[Tuple[int, str]] = []
+        self._by_date: List[Tuple[int, str]] = []
+        self._keys: Dict[str, Tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict]) -> 'ReceiptIndex':
+        """Bulk-build the index with a single sort per key - O(n log n)"""
+        index = cls()
+        for record in records:
+            index._keys[str(record['id'])] = cls._key(record)
+        index._by_amount = sorted((amount, rid) for rid, (amount, _) in index._keys.items())
+        index._by_date = sorted((ordinal, rid) for rid, (_, ordinal) in index._keys.items())
+        return index
+
+    @staticmethod
+    def _key(record: Dict) -> Tuple[int, int]:
+        return to_paise(record['amount']), record['transaction_date'].toordinal()
+
+    def insert(self, record: Dict) -> None:
+        """Add a receipt, replacing any existing entry for its id - O(n) worst case"""
+        receipt_id = str(record['id'])
+        self.delete(receipt_id)
+        amount, ordinal = self._key(record)
+        self._keys[receipt_id] = (amount, ordinal)
+        insort(self._by_amount, (amount, receipt_id))
+        insort(self._by_date, (ordinal, receipt_id))
+
+    def delete(self, receipt_id) -> bool:
+        """Remove a receipt by id"""
+        receipt_id = str(receipt_id)
+        key = self._keys.pop(receipt_id, None)
+        if key is None:
+            return False
+
+        amount, ordinal = key
+        del self._by_amount[bisect_left(self._by_amount, (amount, receipt_id))]
+        del self._by_date[bisect_left(self._by_date, (ordinal, receipt_id))]
+        return True
+
+    def copy(self) -> 'ReceiptIndex':
+        index = ReceiptIndex()
+        index._by_amount = list(self._by_amount)
+        index._by_date = list(self._by_date)
+        index._keys = dict(self._keys)
+        return index
+
+    @staticmethod
+    def _range(entries: List[Tuple[int, str]], low: int, high: int) -> List[str]:
+        start = bisect_left(entries, (low,))
+        # Ids are strings, so (high, chr(0x10FFFF)) sorts after every (high, id)
+        end = bisect_right(entries, (high, chr(0x10FFFF)))
+        return [receipt_id for _, receipt_id in entries[start:end]]
+
+    def amount_range(self, min_amount, max_amount) -> List[str]:
+        """Ids with min_amount <= amount <= max_amount, ascending by amount"""
+        return self._range(self._by_amount, to_paise(min_amount), to_paise(max_amount))
+
+    def date_range(self, start_date: date, end_date: date) -> List[str]:
+        """Ids with start_date <= transaction_date <= end_date, ascending by date"""
+        return self._range(self._by_date, start_date.toordinal(), end_date.toordinal())
+
+    def on_date(self, target_date: date) -> List[str]:
+        """All ids on exactly target_date"""
+        return self.date_range(target_date, target_date)
+
+    def nearest_date(self, target_date: date) -> List[str]:
+        """All ids on the date closest to target_date (earlier date wins ties)"""
+        if not self._by_date:
+            return []
+
+        target = target_date.toordinal()
+        pos = bisect_left(self._by_date, (target,))
+        candidates = []
+        if pos < len(self._by_date):
+            candidates.append(self._by_date[pos][0])
+        if pos > 0:
+            candidates.append(self._by_date[pos - 1][0])
+        nearest = min(candidates, key=lambda ordinal: (abs(ordinal - target), ordinal))
+        return self._range(self._by_date, nearest, nearest)
@@ -1,13 +1,23 @@
 import re
-import PyPDF2
 from datetime import datetime, date
 from decimal import Decimal
-from typing import Dict, Optional, Tuple
-import io
-from PIL import Image
+from typing import Dict, List, Optional, Tuple
+
+from .extractors import DEFAULT_EXTRACTORS, Extractor
 
 class ReceiptParser:
-    """Rule-based receipt parsing with OCR fallback - INR Version"""
+    """Rule-based receipt parsing with OCR fallback - INR Version
+    
+    Text comes from a chain of extractors tried cheapest first (embedded
+    text, then low-res OCR, then full-size OCR). The chain stops at the
+    first result with an amount and a confidence of at least
+    ``confidence_threshold``; ``extraction_stage`` records which one won.
+    The default threshold is the first-line vendor guess (0.3): another
+    extraction cannot turn an unlisted vendor into a pattern match, so
+    only a missing amount or unreadable text (0.1) escalates.
+    """
+    
+    CONFIDENCE_THRESHOLD = 0.3
     
     VENDOR_PATTERNS = {
         'reliance fresh': r'reliance\s*fresh',
@@ -100,7 +110,12 @@ class ReceiptParser:
         'bsnl': 'internet',
     }
     
-    def __init__(self):
+    def __init__(self, extractors: Optional[List[Extractor]] = None,
+                 confidence_threshold: Optional[float] = None):
+        self.extractors = sorted(extractors or DEFAULT_EXTRACTORS, key=lambda e: e.cost)
+        self.confidence_threshold = (
+            self.CONFIDENCE_THRESHOLD if confidence_threshold is None else confidence_threshold
+        )
         self.amount_patterns = [
             r'₹\s*(\d+(?:,\d{3})*(?:\.\d{2})?)',  # ₹1,250.50 or ₹250.50
             r'rs\.?\s*(\d+(?:,\d{3})*(?:\.\d{2})?)',  # Rs. 1,250.50 or Rs 250.50
@@ -122,51 +137,67 @@ class ReceiptParser:
     def parse_file(self, file) -> Dict:
         """Main parsing method"""
         try:
-            file_extension = file.name.lower().split('.')[-1]
-            
-            if file_extension == 'pdf':
-                text = self._extract_pdf_text(file)
-            elif file_extension == 'txt':
-                text = file.read().decode('utf-8')
-            elif file_extension in ['jpg', 'jpeg', 'png']:
-                text = self._extract_image_text(file)
-            else:
-                raise ValueError(f"Unsupported file type: {file_extension}")
-            
-            return self._parse_text(text)
-            
+            return self._run_extractors(file, file.name)
         except Exception as e:
-            return {
-                'vendor': 'Unknown',
-                'amount': Decimal('0.00'),
-                'transaction_date': date.today(),
-                'category': 'other',
-                'raw_text': str(e),
-                'confidence_score': 0.0
-            }
+            return self._failed_result(e)
     
-    def _extract_pdf_text(self, file) -> str:
-        """Extract text from PDF"""
-        reader = PyPDF2.PdfReader(file)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
-        return text
-    
-    def _extract_image_text(self, file) -> str:
-        """Extract text from image using OCR"""
+    def parse_path(self, path: str) -> Dict:
+        """Parse a receipt already stored on disk"""
         try:
-            image = Image.open(file)
-            # Try to import pytesseract, fallback gracefully if not available
-            try:
-                import pytesseract
-                text = pytesseract.image_to_string(image)
-                return text
-            except ImportError:
-                print("Warning: pytesseract not available. OCR functionality disabled.")
-                return "OCR not available - please install pytesseract"
+            return self._run_extractors(path, path)
         except Exception as e:
-            return f"Error processing image: {str(e)}"
+            return self._failed_result(e)
+    
+    def _run_extractors(self, source, name: str) -> Dict:
+        """Try extractors cheapest first and return the first confident result
+        
+        If none is confident, the best result seen is returned. An extractor
+        that fails (e.g. OCR not installed) is skipped.
+        """
+        file_extension = name.lower().split('.')[-1]
+        extractors = [e for e in self.extractors if e.supports(file_extension)]
+        if not extractors:
+            raise ValueError(f"Unsupported file type: {file_extension}")
+        
+        best, error = None, None
+        for extractor in extractors:
+            if hasattr(source, 'seek'):
+                source.seek(0)
+            try:
+                text = extractor.extract(source, file_extension)
+            except Exception as e:
+                error = e
+                continue
+            
+            result = self._parse_text(text)
+            result['extraction_stage'] = extractor.name
+            if self._is_confident(result):
+                return result
+            if best is None or self._rank(result) > self._rank(best):
+                best = result
+        
+        if best is None:
+            raise error
+        return best
+    
+    def _is_confident(self, result: Dict) -> bool:
+        return result['amount'] > 0 and result['confidence_score'] >= self.confidence_threshold
+    
+    @staticmethod
+    def _rank(result: Dict) -> Tuple[bool, float]:
+        return result['amount'] > 0, result['confidence_score']
+    
+    def _failed_result(self, error: Exception) -> Dict:
+        """Placeholder result recorded when extraction fails"""
+        return {
+            'vendor': 'Unknown',
+            'amount': Decimal('0.00'),
+            'transaction_date': date.today(),
+            'category': 'other',
+            'raw_text': str(error),
+            'confidence_score': 0.0,
+            'extraction_stage': ''
+        }
     
     def _parse_text(self, text: str) -> Dict:
         """Parse extracted text for receipt data"""
@@ -277,4 +308,9 @@ class ReceiptParser:
             if key in text:
                 return category
         
-        return 'other'
\ No newline at end of file
+        return 'other'
+
+
+def parse_stored_file(path: str) -> Dict:
+    """Process-pool entry point: parse a receipt file stored on disk"""
+    return ReceiptParser().parse_path(path)
@@ -0,0 +1,104 @@
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import heapq
+
+from .columnar import to_paise
+
+
+class RunningAnalytics:
+    """Analytics aggregates maintained incrementally as receipts change
+
+    Totals are kept in integer paise. A sorted list of amounts gives exact
+    min, max and median after every change without rescanning receipts.
+    """
+
+    def __init__(self):
+        self._receipts: Dict[str, Tuple[str, str, int]] = {}
+        self._amounts: List[int] = []
+        self.total_paise = 0
+        self.category_totals = Counter()
+        self.category_counts = Counter()
+        self.vendor_totals = Counter()
+        self.vendor_counts = Counter()
+
+    def __len__(self) -> int:
+        return len(self._receipts)
+
+    def __contains__(self, receipt_id) -> bool:
+        return str(receipt_id) in self._receipts
+
+    def _add(self, key: Tuple[str, str, int]) -> None:
+        vendor, category, paise = key
+        insort(self._amounts, paise)
+        self.total_paise += paise
+        self.category_totals[category] += paise
+        self.category_counts[category] += 1
+        self.vendor_totals[vendor] += paise
+        self.vendor_counts[vendor] += 1
+
+    def _subtract(self, key: Tuple[str, str, int]) -> None:
+        vendor, category, paise = key
+        del self._amounts[bisect_left(self._amounts, paise)]
+        self.total_paise -= paise
+        self.category_totals[category] -= paise
+        self.category_counts[category] -= 1
+        self.vendor_totals[vendor] -= paise
+        self.vendor_counts[vendor] -= 1
+
+    def apply(self, receipt_id, record: Optional[Dict]) -> Tuple[Optional[Tuple], Optional[Tuple]]:
+        """Upsert a record, or remove the receipt when ``record`` is None
+
+        Returns the (vendor, category, paise) keys before and after; both
+        are equal when nothing that affects the aggregates changed.
+        """
+        receipt_id = str(receipt_id)
+        previous = self._receipts.get(receipt_id)
+        current = None
+        if record is not None:
+            current = (record['vendor'], record['category'], to_paise(record['amount']))
+        if previous == current:
+            return previous, current
+
+        if previous is not None:
+            self._subtract(previous)
+            del self._receipts[receipt_id]
+        if current is not None:
+            self._add(current)
+            self._receipts[receipt_id] = current
+        return previous, current
+
+    def statistics(self) -> Dict[str, Any]:
+        count = len(self._amounts)
+        if not count:
+            return {'count': 0, 'total_spend': 0}
+        middle = count // 2
+        median = self._amounts[middle] if count % 2 else (self._amounts[middle - 1] + self._amounts[middle]) / 2
+        return {
+            'count': count,
+            'total_spend': self.total_paise / 100,
+            'mean_spend': self.total_paise / 100 / count,
+            'median_spend': median / 100,
+            'min_spend': self._amounts[0] / 100,
+            'max_spend': self._amounts[-1] / 100,
+        }
+
+    def category_sums(self, categories: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+        """``{category: {'count', 'total'}}``, limited to ``categories`` if given"""
+        names = +self.category_counts if categories is None else categories
+        return {
+            name: {'count': self.category_counts[name], 'total': self.category_totals[name] / 100}
+            for name in names
+        }
+
+    def top_vendors(self, k: int = 10) -> List[str]:
+        """The k vendors with the highest spend, highest first"""
+        return heapq.nlargest(k, +self.vendor_counts, key=lambda name: self.vendor_totals[name])
+
+    def vendor_sums(self, vendors: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+        """``{vendor: {'count', 'total'}}``, limited to ``vendors`` if given"""
+        names = +self.vendor_counts if vendors is None else vendors
+        return {
+            name: {'count': self.vendor_counts[name], 'total': self.vendor_totals[name] / 100}
+            for name in names
+        }
@@ -0,0 +1,294 @@
+from array import array
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+import hashlib
+import math
+import operator
+
+from .columnar import numpy
+
+
+def hash64(value: str, salt: bytes = b'') -> int:
+    """Stable 64-bit hash (Python's hash() is randomized per process)"""
+    digest = hashlib.blake2b(value.encode('utf-8'), digest_size=8, salt=salt.ljust(16, b'\0'))
+    return int.from_bytes(digest.digest(), 'big')
+
+
+class HyperLogLog:
+    """Distinct-count estimator with relative standard error 1.04 / sqrt(2^p)"""
+
+    def __init__(self, precision: int = 12, registers: Optional[bytes] = None):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(registers) if registers else bytearray(self.size)
+
+    def add(self, value: str) -> None:
+        h = hash64(value)
+        index = h >> (64 - self.precision)
+        remainder = (h << self.precision) & ((1 << 64) - 1)
+        rank = 64 - self.precision + 1 if remainder == 0 else 65 - remainder.bit_length()
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: 'HyperLogLog') -> None:
+        np = numpy()
+        if np is None:
+            self.registers = bytearray(map(max, self.registers, other.registers))
+        else:
+            merged = np.maximum(np.frombuffer(self.registers, dtype=np.uint8),
+                                np.frombuffer(other.registers, dtype=np.uint8))
+            self.registers = bytearray(merged.tobytes())
+
+    def count(self) -> int:
+        m = self.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Small-range correction: linear counting
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / math.sqrt(self.size)
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.registers)
+
+
+class CountMinSketch:
+    """Frequency estimator that never under-counts
+
+    With probability 1 - e^-depth, an estimate exceeds the true count by at
+    most (e / width) * total.
+    """
+
+    def __init__(self, width: int = 512, depth: int = 4, counters: Optional[bytes] = None):
+        self.width = width
+        self.depth = depth
+        self.counters = array('I')
+        if counters:
+            self.counters.frombytes(counters)
+        else:
+            self.counters.extend([0] * (width * depth))
+        self.total = 0
+
+    def _cells(self, key: str) -> Iterable[int]:
+        h = hash64(key)
+        h1, h2 = h & 0xFFFFFFFF, h >> 32
+        for row in range(self.depth):
+            yield row * self.width + (h1 + row * h2) % self.width
+
+    def add(self, key: str, count: int = 1) -> None:
+        for cell in self._cells(key):
+            self.counters[cell] += count
+        self.total += count
+
+    def estimate(self, key: str) -> int:
+        return min(self.counters[cell] for cell in self._cells(key))
+
+    def merge(self, other: 'CountMinSketch') -> None:
+        np = numpy()
+        if np is None:
+            self.counters = array('I', map(operator.add, self.counters, other.counters))
+        else:
+            merged = np.frombuffer(self.counters, dtype=np.uint32) + np.frombuffer(other.counters, dtype=np.uint32)
+            self.counters = array('I', merged.tobytes())
+        self.total += other.total
+
+    @property
+    def error_bound(self) -> float:
+        return math.e / self.width * self.total
+
+    @property
+    def confidence(self) -> float:
+        return 1 - math.exp(-self.depth)
+
+    def to_bytes(self) -> bytes:
+        return self.counters.tobytes()
+
+
+class SpaceSaving:
+    """Weighted heavy-hitter tracker with at most ``capacity`` counters
+
+    Each tracked key's true weight lies in [count - error, count]. Any key
+    heavier than total / capacity is guaranteed to be tracked.
+    """
+
+    def __init__(self, capacity: int = 100, counters: Optional[Dict[str, List[int]]] = None):
+        self.capacity = capacity
+        self.counters: Dict[str, List[int]] = {k: list(v) for k, v in (counters or {}).items()}
+
+    def add(self, key: str, weight: int = 1) -> None:
+        entry = self.counters.get(key)
+        if entry is not None:
+            entry[0] += weight
+        elif len(self.counters) < self.capacity:
+            self.counters[key] = [weight, 0]
+        else:
+            victim = min(self.counters, key=lambda k: self.counters[k][0])
+            floor = self.counters.pop(victim)[0]
+            self.counters[key] = [floor + weight, floor]
+
+    def _floor(self) -> int:
+        if len(self.counters) < self.capacity:
+            return 0
+        return min(count for count, _ in self.counters.values())
+
+    def merge(self, other: 'SpaceSaving') -> None:
+        """Mergeable summary: keys missing from one side may hide up to its floor"""
+        own_floor, other_floor = self._floor(), other._floor()
+        merged = {}
+        for key in set(self.counters) | set(other.counters):
+            count_a, error_a = self.counters.get(key, (own_floor, own_floor))
+            count_b, error_b = other.counters.get(key, (other_floor, other_floor))
+            merged[key] = [count_a + count_b, error_a + error_b]
+        top = sorted(merged.items(), key=lambda item: -item[1][0])[:self.capacity]
+        self.counters = dict(top)
+
+    def top(self, k: int) -> List[Tuple[str, int, int]]:
+        """(key, estimated weight, max over-estimate) for the k heaviest keys"""
+        ranked = sorted(self.counters.items(), key=lambda item: -item[1][0])[:k]
+        return [(key, count, error) for key, (count, error) in ranked]
+
+    def to_dict(self) -> Dict[str, List[int]]:
+        return self.counters
+
+
+class TDigest:
+    """Mergeable quantile sketch (merging t-digest with the k1 scale function)"""
+
+    def __init__(self, compression: float = 100, centroids: Optional[List[List[float]]] = None):
+        self.compression = compression
+        self.centroids: List[List[float]] = [list(c) for c in centroids or []]
+        self._buffer: List[List[float]] = []
+
+    @property
+    def count(self) -> float:
+        self._flush()
+        return sum(weight for _, weight in self.centroids)
+
+    def add(self, value: float, weight: float = 1) -> None:
+        self._buffer.append([value, weight])
+        if len(self._buffer) >= 10 * self.compression:
+            self._flush()
+
+    def merge(self, other: 'TDigest') -> None:
+        other._flush()
+        self._buffer.extend(list(c) for c in other.centroids)
+        self._flush()
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        points = sorted(self.centroids + self._buffer, key=lambda c: c[0])
+        self._buffer = []
+        total = sum(weight for _, weight in points)
+
+        def k(q):
+            return self.compression / (2 * math.pi) * math.asin(2 * min(max(q, 0), 1) - 1)
+
+        merged = [list(points[0])]
+        seen = 0.0
+        k_low = k(0)
+        for mean, weight in points[1:]:
+            current = merged[-1]
+            q = (seen + current[1] + weight) / total
+            if k(q) - k_low <= 1:
+                combined = current[1] + weight
+                current[0] += (mean - current[0]) * weight / combined
+                current[1] = combined
+            else:
+                seen += current[1]
+                k_low = k(seen / total)
+                merged.append([mean, weight])
+        self.centroids = merged
+
+    def quantile(self, q: float) -> Optional[float]:
+        self._flush()
+        if not self.centroids:
+            return None
+        if len(self.centroids) == 1:
+            return self.centroids[0][0]
+
+        total = sum(weight for _, weight in self.centroids)
+        target = q * total
+        cumulative = 0.0
+        for i, (mean, weight) in enumerate(self.centroids):
+            center = cumulative + weight / 2
+            if target < center:
+                if i == 0:
+                    return mean
+                prev_mean, prev_weight = self.centroids[i - 1]
+                prev_center = cumulative - prev_weight / 2
+                fraction = (target - prev_center) / (center - prev_center)
+                return prev_mean + fraction * (mean - prev_mean)
+            cumulative += weight
+        return self.centroids[-1][0]
+
+    def to_list(self) -> List[List[float]]:
+        self._flush()
+        return self.centroids
+
+
+class VendorSketch:
+    """Per-period bundle of the sketches behind approximate analytics"""
+
+    def __init__(self, hll=None, frequencies=None, top_spend=None, amounts=None,
+                 receipt_count: int = 0, total_paise: int = 0):
+        self.hll = hll or HyperLogLog()
+        self.frequencies = frequencies or CountMinSketch()
+        self.top_spend = top_spend or SpaceSaving()
+        self.amounts = amounts or TDigest()
+        self.receipt_count = receipt_count
+        self.total_paise = total_paise
+
+    def add(self, vendor: str, amount_paise: int) -> None:
+        key = vendor.strip().lower()
+        self.hll.add(key)
+        self.frequencies.add(key)
+        self.top_spend.add(key, amount_paise)
+        self.amounts.add(amount_paise / 100)
+        self.receipt_count += 1
+        self.total_paise += amount_paise
+
+    def merge(self, other: 'VendorSketch') -> None:
+        self.hll.merge(other.hll)
+        self.frequencies.merge(other.frequencies)
+        self.top_spend.merge(other.top_spend)
+        self.amounts.merge(other.amounts)
+        self.receipt_count += other.receipt_count
+        self.total_paise += other.total_paise
+
+    def summary(self, k: int = 10) -> Dict[str, Any]:
+        """Approximate analytics with the error bound of each estimate"""
+        top = self.top_spend.top(k)
+        percentiles = {
+            f'p{int(q * 100)}': self.amounts.quantile(q) for q in (0.5, 0.9, 0.95, 0.99)
+        }
+        return {
+            'statistics': {
+                'count': self.receipt_count,
+                'total_spend': self.total_paise / 100,
+                'mean_spend': self.total_paise / 100 / self.receipt_count if self.receipt_count else 0,
+                'median_spend': percentiles['p50'],
+                'percentiles': percentiles,
+                'distinct_vendors': self.hll.count(),
+            },
+            'top_vendors': [
+                {
+                    'vendor': vendor.title(),
+                    'total_spend': spend / 100,
+                    'max_overestimate': error / 100,
+                    'receipt_count': self.frequencies.estimate(vendor),
+                }
+                for vendor, spend, error in top
+            ],
+            'error_bounds': {
+                'distinct_vendors_relative_std_error': self.hll.relative_error,
+                'receipt_count_max_overestimate': self.frequencies.error_bound,
+                'receipt_count_confidence': self.frequencies.confidence,
+                'top_vendor_guaranteed_above_spend': self.total_paise / 100 / self.top_spend.capacity,
+                'percentile_compression': self.amounts.compression,
+            },
+        }
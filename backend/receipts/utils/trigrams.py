@@ -0,0 +1,70 @@
+from collections import Counter, defaultdict
+from typing import List, Dict, Set, Tuple
+import re
+
+WORD_RE = re.compile(r'[^\W_]+')
+
+
+def trigrams(text: str) -> Set[str]:
+    """pg_trgm-compatible trigrams: each lowercased word padded as '  word '"""
+    result = set()
+    for word in WORD_RE.findall(text.lower()):
+        padded = f'  {word} '
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+class TrigramIndex:
+    """In-process trigram posting lists over distinct strings (vendor names)
+
+    Scores mirror pg_trgm: ``similarity`` is shared / union trigrams and
+    ``word_similarity`` is the share of the query's trigrams found in the
+    name, which rewards prefixes typed during autocomplete.
+    """
+
+    def __init__(self):
+        self.names: List[str] = []
+        self._sizes: List[int] = []
+        self._codes: Dict[str, int] = {}
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def add(self, name: str) -> int:
+        """Index a name once; returns its code"""
+        code = self._codes.get(name)
+        if code is not None:
+            return code
+
+        code = len(self.names)
+        grams = trigrams(name)
+        self.names.append(name)
+        self._sizes.append(len(grams))
+        self._codes[name] = code
+        for gram in grams:
+            self._postings[gram].append(code)
+        return code
+
+    def search(self, query: str, limit: int = 10, threshold: float = 0.3) -> List[Tuple[str, float]]:
+        """Names ranked by max(similarity, word_similarity) above threshold"""
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+
+        shared = Counter()
+        for gram in query_grams:
+            postings = self._postings.get(gram)
+            if postings:
+                shared.update(postings)
+
+        scored = []
+        for code, overlap in shared.items():
+            similarity = overlap / (len(query_grams) + self._sizes[code] - overlap)
+            word_similarity = overlap / len(query_grams)
+            score = max(similarity, word_similarity)
+            if score >= threshold:
+                scored.append((score, similarity, code))
+
+        scored.sort(key=lambda item: (-item[0], -item[1], self.names[item[2]]))
+        return [(self.names[code], round(score, 4)) for score, _, code in scored[:limit]]
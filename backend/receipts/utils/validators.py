@@ -11,6 +11,7 @@ class ReceiptData(BaseModel):
     category: Optional[str] = 'other'
     raw_text: Optional[str] = ''
     confidence_score: Optional[float] = 0.0
+    extraction_stage: Optional[str] = ''
     
     @validator('vendor')
     def validate_vendor(cls, v):
@@ -0,0 +1,36 @@
+from django.db import connection
+from django.db.models import Count
+from django.db.models.functions import Greatest
+
+from .cache import receipt_table_cache
+from .models import Receipt
+
+
+def suggest_vendors(query, limit=10):
+    """Fuzzy, ranked vendor suggestions backed by a trigram index
+    
+    On Postgres this uses pg_trgm and its GIN index on vendor; elsewhere the
+    per-worker in-process trigram index over distinct vendors.
+    """
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import TrigramSimilarity, TrigramWordSimilarity
+        
+        rows = (
+            Receipt.objects.filter(vendor__trigram_word_similar=query)
+            .values('vendor')
+            .annotate(
+                receipt_count=Count('id'),
+                score=Greatest(
+                    TrigramSimilarity('vendor', query),
+                    TrigramWordSimilarity(query, 'vendor')
+                )
+            )
+            .order_by('-score', 'vendor')[:limit]
+        )
+        return [
+            {'vendor': row['vendor'], 'score': round(row['score'], 4),
+             'receipt_count': row['receipt_count']}
+            for row in rows
+        ]
+    
+    return receipt_table_cache.suggest_vendors(query, limit)
@@ -1,17 +1,33 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
-from django.db.models import Q, Sum, Count
-from django.http import HttpResponse
-from datetime import datetime, date
+from django.db.models import Sum, Count
+from django.conf import settings
+from django.http import HttpResponse, FileResponse, HttpResponseNotModified
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from datetime import datetime, date, timedelta
+from decimal import Decimal
 import csv
 import json
 
-from .models import Receipt
-from .serializers import ReceiptSerializer, ReceiptUploadSerializer, ReceiptUpdateSerializer
+from .models import Receipt, ReceiptText, ReceiptTombstone
+from .serializers import (
+    ReceiptSerializer, ReceiptListSerializer, ReceiptUploadSerializer,
+    ReceiptUpdateSerializer, parse_fields_param
+)
 from .utils.parsers import ReceiptParser
 from .utils.algorithms import ReceiptAnalytics
+from .utils.columnar import ColumnarAnalytics
+from .cache import get_receipt_table, lookup_receipts
+from .storage import spool_upload, discard_upload, content_hash
+from .previews import get_preview, warm_preview
+from .filters import filter_receipts, table_filters
+from .approximate import approximate_analytics
+from .vendors import suggest_vendors
+from .duplicates import find_duplicate
 from .utils.validators import ReceiptData, ValidationError
 
 class ReceiptViewSet(viewsets.ModelViewSet):
@@ -19,41 +35,37 @@ class ReceiptViewSet(viewsets.ModelViewSet):
     serializer_class = ReceiptSerializer
     parser_classes = (MultiPartParser, FormParser)
     
+    # Actions that never render raw_text, so it is not loaded from the DB
+    LIGHTWEIGHT_ACTIONS = ('list', 'export')
+    
+    # Cursors are rewound by this much so writes committing while a changes
+    # request runs are picked up by the next one (merges are idempotent)
+    SYNC_OVERLAP = timedelta(seconds=2)
+    
+    def get_serializer_class(self):
+        if self.action in self.LIGHTWEIGHT_ACTIONS:
+            return ReceiptListSerializer
+        return ReceiptSerializer
+    
     def get_queryset(self):
         queryset = Receipt.objects.all()
         
-        # Apply filters
-        vendor = self.request.query_params.get('vendor')
-        category = self.request.query_params.get('category')
-        min_amount = self.request.query_params.get('min_amount')
-        max_amount = self.request.query_params.get('max_amount')
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
-        search = self.request.query_params.get('search')
-        
-        if vendor:
-            queryset = queryset.filter(vendor__icontains=vendor)
-        if category:
-            queryset = queryset.filter(category=category)
-        if min_amount:
-            queryset = queryset.filter(amount__gte=min_amount)
-        if max_amount:
-            queryset = queryset.filter(amount__lte=max_amount)
-        if start_date:
-            queryset = queryset.filter(transaction_date__gte=start_date)
-        if end_date:
-            queryset = queryset.filter(transaction_date__lte=end_date)
-        if search:
-            queryset = queryset.filter(
-                Q(vendor__icontains=search) |
-                Q(raw_text__icontains=search)
-            )
-        
-        # Apply sorting
-        sort_by = self.request.query_params.get('sort_by', '-transaction_date')
-        queryset = queryset.order_by(sort_by)
+        if self.action in self.LIGHTWEIGHT_ACTIONS:
+            queryset = self._restrict_columns(queryset)
         
-        return queryset
+        return filter_receipts(queryset, self.request.query_params)
+    
+    def _restrict_columns(self, queryset):
+        """Select only the columns the list serializer will render"""
+        requested = parse_fields_param(self.request.query_params.get('fields'))
+        if requested:
+            model_fields = {f.name for f in Receipt._meta.concrete_fields}
+            if 'preview_url' in requested:
+                requested = requested | {'content_hash'}
+            columns = (requested & model_fields) - {'raw_text'}
+            if columns:
+                return queryset.only(*columns)
+        return queryset.defer('raw_text')
     
     @action(detail=False, methods=['post'])
     def upload(self, request):
@@ -61,21 +73,32 @@ class ReceiptViewSet(viewsets.ModelViewSet):
         serializer = ReceiptUploadSerializer(data=request.data)
         
         if serializer.is_valid():
+            stored_name = None
             try:
                 file = serializer.validated_data['file']
                 
+                # Store the upload once, then parse it from disk
+                stored_name, stored_path = spool_upload(file)
+                
                 # Parse the receipt
                 parser = ReceiptParser()
-                parsed_data = parser.parse_file(file)
+                parsed_data = parser.parse_path(stored_path)
                 
                 # Validate parsed data
                 receipt_data = ReceiptData(**parsed_data)
                 
-                # Create receipt record
+                # Create receipt record pointing at the stored file, flagged
+                # if it looks like one already on record
                 receipt = Receipt.objects.create(
-                    file=file,
+                    file=stored_name,
+                    content_hash=content_hash(stored_path),
+                    duplicate_of_id=find_duplicate(
+                        receipt_data.vendor, receipt_data.amount,
+                        receipt_data.transaction_date, receipt_data.raw_text
+                    ),
                     **receipt_data.dict()
                 )
+                warm_preview(receipt)
                 
                 return Response(
                     ReceiptSerializer(receipt).data,
@@ -83,11 +106,15 @@ class ReceiptViewSet(viewsets.ModelViewSet):
                 )
                 
             except ValidationError as e:
+                if stored_name:
+                    discard_upload(stored_name)
                 return Response(
                     {'error': str(e)},
                     status=status.HTTP_400_BAD_REQUEST
                 )
             except Exception as e:
+                if stored_name:
+                    discard_upload(stored_name)
                 return Response(
                     {'error': f'Processing failed: {str(e)}'},
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -98,11 +125,20 @@ class ReceiptViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def analytics(self, request):
         """Get analytics and insights"""
-        receipts = list(self.get_queryset().values(
-            'vendor', 'transaction_date', 'amount', 'category'
-        ))
+        if request.query_params.get('approximate') == 'true':
+            data = approximate_analytics(request.query_params)
+            if data is not None:
+                return Response(data)
         
-        analytics = ReceiptAnalytics()
+        table = self._analytics_table()
+        if table is not None:
+            analytics = ColumnarAnalytics()
+            receipts = table
+        else:
+            analytics = ReceiptAnalytics()
+            receipts = list(self.get_queryset().values(
+                'vendor', 'transaction_date', 'amount', 'category'
+            ))
         
         # Compute statistics
         stats = analytics.compute_statistics(receipts)
@@ -125,30 +161,177 @@ class ReceiptViewSet(viewsets.ModelViewSet):
             'time_series': time_series
         })
     
+    def _analytics_table(self):
+        """Cached columnar table filtered like get_queryset, if the filters allow it"""
+        filters = table_filters(self.request.query_params)
+        if filters is None:
+            return None
+        
+        return get_receipt_table().filter(**filters)
+    
     @action(detail=False, methods=['get'])
     def search(self, request):
         """Advanced search functionality"""
         query_type = request.query_params.get('type', 'keyword')
         query = request.query_params.get('q', '')
         
-        receipts = list(self.get_queryset().values(
-            'id', 'vendor', 'transaction_date', 'amount', 'category', 'raw_text'
-        ))
+        field = request.query_params.get('field', 'vendor')
+        
+        try:
+            bounds = self._search_bounds(query_type, request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        nearest = request.query_params.get('nearest') == 'true'
+        
+        if query_type in ('range', 'date') and self._uses_cached_table():
+            if query_type == 'range':
+                results = lookup_receipts('amount_range', *bounds)
+            else:
+                results = lookup_receipts('nearest_date' if nearest else 'on_date', bounds)
+            return Response({'results': results})
+        
+        columns = ['id', 'vendor', 'transaction_date', 'amount', 'category']
+        if query_type == 'pattern' and field == 'raw_text':
+            # Only pull the OCR text when it is actually being searched
+            columns.append('raw_text')
+        receipts = list(self.get_queryset().values(*columns))
+        if 'raw_text' in columns and request.query_params.get('include_archived') == 'true':
+            archived = dict(ReceiptText.texts_for(self.get_queryset()))
+            for receipt in receipts:
+                if receipt['id'] in archived:
+                    receipt['raw_text'] = archived[receipt['id']]
         
         analytics = ReceiptAnalytics()
         
         if query_type == 'pattern':
-            field = request.query_params.get('field', 'vendor')
             results = analytics.pattern_search(receipts, field, query)
         elif query_type == 'range':
-            min_amount = float(request.query_params.get('min', 0))
-            max_amount = float(request.query_params.get('max', 999999))
-            results = analytics.range_search(receipts, min_amount, max_amount)
+            min_amount, max_amount = bounds
+            results = analytics.range_search(receipts, float(min_amount), float(max_amount))
+        elif query_type == 'date':
+            target = bounds
+            if nearest and receipts:
+                # Same rule as ReceiptIndex.nearest_date: the earlier date wins ties
+                target = min(
+                    {r['transaction_date'] for r in receipts},
+                    key=lambda day: (abs(day - bounds), day)
+                )
+            results = [r for r in receipts if r['transaction_date'] == target]
         else:  # keyword search
             results = analytics.linear_search(receipts, 'vendor', query)
         
         return Response({'results': results})
     
+    @staticmethod
+    def _search_bounds(query_type, params):
+        """Parsed (min, max) amounts for range searches, the date for date searches"""
+        if query_type == 'range':
+            try:
+                bounds = Decimal(params.get('min', 0)), Decimal(params.get('max', 999999))
+            except ArithmeticError:
+                raise ValueError('min and max must be numbers')
+            if not all(bound.is_finite() for bound in bounds):
+                raise ValueError('min and max must be numbers')
+            return bounds
+        if query_type == 'date':
+            try:
+                return date.fromisoformat(params.get('date', ''))
+            except ValueError:
+                raise ValueError('date must be an ISO date (YYYY-MM-DD)')
+        return None
+    
+    def _uses_cached_table(self):
+        """True when no get_queryset filters apply, so the cache covers the result"""
+        params = self.request.query_params
+        filters = ('vendor', 'category', 'min_amount', 'max_amount',
+                   'start_date', 'end_date', 'search')
+        return not any(params.get(name) for name in filters)
+    
+    @action(detail=True, methods=['get'])
+    def preview(self, request, pk=None):
+        """Downscaled image of the receipt file (?size=thumb|medium)"""
+        size = request.query_params.get('size', 'thumb')
+        if size not in settings.PREVIEW_SIZES:
+            return Response(
+                {'error': f"Unknown size. Allowed: {', '.join(settings.PREVIEW_SIZES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        receipt = get_object_or_404(Receipt.objects.only('id', 'file', 'content_hash'), pk=pk)
+        try:
+            path, content_type = get_preview(receipt, size)
+        except Exception as e:
+            return Response(
+                {'error': f'Preview failed: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        
+        etag = f'"{receipt.content_hash}-{size}"'
+        if request.headers.get('If-None-Match') == etag:
+            response = HttpResponseNotModified()
+        else:
+            response = FileResponse(open(path, 'rb'), content_type=content_type)
+        response['ETag'] = etag
+        if request.query_params.get('v') == receipt.content_hash:
+            # Versioned URL: the content for it can never change
+            response['Cache-Control'] = 'public, max-age=31536000, immutable'
+        else:
+            response['Cache-Control'] = 'public, max-age=300'
+        return response
+    
+    @action(detail=False, methods=['get'])
+    def vendors(self, request):
+        """Fuzzy vendor autocomplete: ranked suggestions for ?q="""
+        query = request.query_params.get('q', '').strip()
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 10)), 50))
+        except ValueError:
+            return Response(
+                {'error': 'limit must be an integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if not query:
+            return Response({'results': []})
+        
+        return Response({'results': suggest_vendors(query, limit)})
+    
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """Receipts created, updated or deleted since the ``since`` cursor
+        
+        Without a cursor, or with one older than the tombstone retention,
+        every receipt is returned with ``reset: true``.
+        """
+        now = timezone.now()
+        since_param = request.query_params.get('since')
+        since = parse_datetime(since_param) if since_param else None
+        if since_param and since is None:
+            return Response(
+                {'error': 'Invalid since cursor'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Tombstones past the retention are pruned by manage.py prune_tombstones
+        retention = timedelta(days=settings.TOMBSTONE_RETENTION_DAYS)
+        reset = since is None or since < now - retention
+        changed = Receipt.objects.defer('raw_text')
+        deleted = []
+        if not reset:
+            changed = changed.filter(updated_at__gte=since)
+            deleted = ReceiptTombstone.objects.filter(
+                deleted_at__gte=since
+            ).values_list('receipt_id', flat=True)
+        
+        return Response({
+            'cursor': (now - self.SYNC_OVERLAP).isoformat(),
+            'reset': reset,
+            'changed': ReceiptListSerializer(
+                changed, many=True, context=self.get_serializer_context()
+            ).data,
+            'deleted': [str(receipt_id) for receipt_id in deleted],
+        })
+    
     @action(detail=False, methods=['get'])
     def export(self, request):
         """Export receipts as CSV or JSON"""
@@ -156,7 +339,9 @@ class ReceiptViewSet(viewsets.ModelViewSet):
         receipts = self.get_queryset()
         
         if format_type == 'json':
-            data = ReceiptSerializer(receipts, many=True).data
+            data = ReceiptListSerializer(
+                receipts, many=True, context=self.get_serializer_context()
+            ).data
             response = HttpResponse(
                 json.dumps(data, indent=2, default=str),
                 content_type='application/json'
@@ -169,13 +354,16 @@ class ReceiptViewSet(viewsets.ModelViewSet):
             writer = csv.writer(response)
             writer.writerow(['Vendor', 'Date', 'Amount', 'Category', 'Created'])
             
-            for receipt in receipts:
+            rows = receipts.values_list(
+                'vendor', 'transaction_date', 'amount', 'category', 'created_at'
+            )
+            for vendor, transaction_date, amount, category, created_at in rows:
                 writer.writerow([
-                    receipt.vendor,
-                    receipt.transaction_date,
-                    receipt.amount,
-                    receipt.category,
-                    receipt.created_at.strftime('%Y-%m-%d %H:%M:%S')
+                    vendor,
+                    transaction_date,
+                    amount,
+                    category,
+                    created_at.strftime('%Y-%m-%d %H:%M:%S')
                 ])
         
         return response
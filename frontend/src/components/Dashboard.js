@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import { receiptAPI } from '../services/api';
+import { receiptAPI, receiptSync, sortReceipts, subscribeToReceiptEvents } from '../services/api';
 import { formatCurrency, formatDate } from '../utils/formatters';
 
 const Dashboard = () => {
@@ -9,18 +9,38 @@ const Dashboard = () => {
 
   useEffect(() => {
     fetchDashboardData();
+
+    const showRecent = (receipts) => {
+      setRecentReceipts(sortReceipts(receipts, '-created_at').slice(0, 5));
+    };
+    const applyReceipt = (receipt, event) => showRecent(receiptSync.apply(event, receipt));
+    const applyTotals = (data) => {
+      setStats((current) => ({ ...current, ...data.statistics }));
+    };
+
+    return subscribeToReceiptEvents({
+      snapshot: (data) => {
+        applyTotals(data);
+        // Catch up on receipts changed while disconnected
+        receiptSync.refresh().then(showRecent).catch(() => {});
+      },
+      analytics: applyTotals,
+      'receipt.created': applyReceipt,
+      'receipt.updated': applyReceipt,
+      'receipt.deleted': applyReceipt,
+    });
   }, []);
 
   const fetchDashboardData = async () => {
     try {
       setLoading(true);
-      const [analyticsResponse, receiptsResponse] = await Promise.all([
+      const [analyticsResponse, allReceipts] = await Promise.all([
         receiptAPI.getAnalytics(),
-        receiptAPI.getReceipts({ ordering: '-created_at', limit: 5 })
+        receiptSync.refresh()
       ]);
       
       setStats(analyticsResponse.data.statistics);
-      setRecentReceipts(receiptsResponse.data.results || receiptsResponse.data);
+      setRecentReceipts(sortReceipts(allReceipts, '-created_at').slice(0, 5));
     } catch (error) {
       console.error('Error fetching dashboard data:', error);
     } finally {
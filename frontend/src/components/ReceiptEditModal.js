@@ -83,6 +83,18 @@ const ReceiptEditModal = ({ isOpen, onClose, receipt, onSave }) => {
 
           {/* Form */}
           <form onSubmit={handleSubmit} className="p-8 space-y-6">
+            {/* Receipt Preview */}
+            {receipt?.preview_url && (
+              <a href={receipt.file} target="_blank" rel="noopener noreferrer" className="block">
+                <img
+                  src={`${receipt.preview_url}${receipt.preview_url.includes('?') ? '&' : '?'}size=medium`}
+                  alt={`Receipt from ${receipt.vendor}`}
+                  loading="lazy"
+                  className="w-full max-h-64 object-contain rounded-xl border-2 border-gray-200 bg-white"
+                />
+              </a>
+            )}
+
             {/* Vendor */}
             <div className="space-y-2">
               <label className="block text-sm font-semibold text-gray-700">
@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import { receiptAPI } from '../services/api';
+import { receiptAPI, receiptSync, sortReceipts } from '../services/api';
 import { formatCurrency, formatDate } from '../utils/formatters';
 import ReceiptEditModal from './ReceiptEditModal';
 
@@ -19,16 +19,37 @@ const ReceiptList = () => {
   const [editingReceipt, setEditingReceipt] = useState(null);
   const [showEditModal, setShowEditModal] = useState(false);
   const [exportLoading, setExportLoading] = useState(null);
+  const [vendorSuggestions, setVendorSuggestions] = useState([]);
 
   useEffect(() => {
     fetchReceipts();
   }, [filters]);
 
+  useEffect(() => {
+    const query = filters.search.trim();
+    if (query.length < 2) {
+      setVendorSuggestions([]);
+      return;
+    }
+    receiptAPI.suggestVendors(query)
+      .then((response) => setVendorSuggestions(response.data.results))
+      .catch((error) => console.error('Error fetching vendor suggestions:', error));
+  }, [filters.search]);
+
   const fetchReceipts = async () => {
     try {
       setLoading(true);
-      const response = await receiptAPI.getReceipts(filters);
-      setReceipts(response.data.results || response.data);
+      const { sort_by, ...filterValues } = filters;
+      const hasFilters = Object.values(filterValues).some((value) => value !== '');
+
+      if (hasFilters) {
+        const response = await receiptAPI.getReceipts(filters);
+        setReceipts(response.data.results || response.data);
+      } else {
+        // Unfiltered view: merge only what changed since the last refresh
+        const allReceipts = await receiptSync.refresh();
+        setReceipts(sortReceipts(allReceipts, sort_by));
+      }
     } catch (error) {
       console.error('Error fetching receipts:', error);
     } finally {
@@ -212,8 +233,14 @@ const ReceiptList = () => {
                       value={filters.search}
                       onChange={(e) => handleFilterChange('search', e.target.value)}
                       placeholder="Search vendor or text..."
+                      list="vendor-suggestions"
                       className="w-full pl-10 pr-4 py-3 rounded-xl border-2 border-gray-200 bg-white/80 text-gray-900 transition-all duration-300 focus:border-blue-500 focus:bg-white focus:outline-none focus:ring-4 focus:ring-blue-500/20"
                     />
+                    <datalist id="vendor-suggestions">
+                      {vendorSuggestions.map((suggestion) => (
+                        <option key={suggestion.vendor} value={suggestion.vendor} />
+                      ))}
+                    </datalist>
                     <div className="absolute inset-y-0 left-0 pl-3 flex items-center">
                       <span className="text-gray-400">🔍</span>
                     </div>
@@ -335,11 +362,20 @@ const ReceiptList = () => {
                       <div className="relative bg-white/60 backdrop-blur-sm border border-white/40 rounded-2xl p-6 hover:shadow-xl transition-all duration-300 hover:scale-[1.02]">
                         <div className="flex items-center justify-between">
                           <div className="flex items-center space-x-4">
-                            {/* Vendor Icon */}
-                            <div className="w-16 h-16 bg-gradient-to-r from-blue-500 to-purple-600 rounded-2xl flex items-center justify-center shadow-lg group-hover:scale-110 transition-transform duration-300">
-                              <span className="text-white font-bold text-xl">
-                                {receipt.vendor.charAt(0).toUpperCase()}
-                              </span>
+                            {/* Receipt Thumbnail (vendor initial until it loads) */}
+                            <div className="w-16 h-16 bg-gradient-to-r from-blue-500 to-purple-600 rounded-2xl flex items-center justify-center shadow-lg overflow-hidden group-hover:scale-110 transition-transform duration-300">
+                              {receipt.preview_url ? (
+                                <img
+                                  src={receipt.preview_url}
+                                  alt={receipt.vendor}
+                                  loading="lazy"
+                                  className="w-full h-full object-cover"
+                                />
+                              ) : (
+                                <span className="text-white font-bold text-xl">
+                                  {receipt.vendor.charAt(0).toUpperCase()}
+                                </span>
+                              )}
                             </div>
                             
                             {/* Receipt Details */}
@@ -357,6 +393,14 @@ const ReceiptList = () => {
                                 }`}>
                                   {receipt.category}
                                 </span>
+                                {receipt.duplicate_of && (
+                                  <span
+                                    className="px-3 py-1 rounded-full text-xs font-semibold bg-red-100 text-red-800"
+                                    title="Same amount and date as an earlier receipt"
+                                  >
+                                    possible duplicate
+                                  </span>
+                                )}
                               </div>
                               
                               <div className="flex items-center space-x-6 text-sm text-gray-600">
@@ -34,6 +34,12 @@ export const receiptAPI = {
   // Get analytics
   getAnalytics: (params = {}) => api.get('/receipts/analytics/', { params }),
   
+  // Receipts created, updated or deleted since a sync cursor
+  getChanges: (since) => api.get('/receipts/changes/', { params: since ? { since } : {} }),
+  
+  // Fuzzy vendor autocomplete
+  suggestVendors: (q, limit = 10) => api.get('/receipts/vendors/', { params: { q, limit } }),
+  
   // Advanced search
   searchReceipts: (params) => api.get('/receipts/search/', { params }),
   
@@ -45,4 +51,70 @@ export const receiptAPI = {
     }),
 };
 
+// Local receipt state kept current with the changes feed: after the first
+// load, each refresh only transfers receipts that changed since the cursor.
+export const createReceiptSync = () => {
+  let cursor = null;
+  const receiptsById = new Map();
+
+  return {
+    refresh: async () => {
+      const { data } = await receiptAPI.getChanges(cursor);
+      if (data.reset) {
+        receiptsById.clear();
+      }
+      data.deleted.forEach((id) => receiptsById.delete(id));
+      data.changed.forEach((receipt) => receiptsById.set(receipt.id, receipt));
+      cursor = data.cursor;
+      return Array.from(receiptsById.values());
+    },
+    // Apply a receipt event from the live stream without refetching
+    apply: (event, receipt) => {
+      if (event === 'receipt.deleted') {
+        receiptsById.delete(receipt.id);
+      } else {
+        receiptsById.set(receipt.id, receipt);
+      }
+      return Array.from(receiptsById.values());
+    },
+  };
+};
+
+export const receiptSync = createReceiptSync();
+
+// Live receipt and analytics events, served by the async (ASGI) views.
+// Returns a function that closes the stream. onUnavailable runs when the
+// server does not offer the stream, e.g. under WSGI.
+export const subscribeToReceiptEvents = (handlers, onUnavailable = () => {}) => {
+  const source = new EventSource(`${API_BASE_URL}/receipts/events/`);
+  let opened = false;
+
+  source.onopen = () => { opened = true; };
+  source.onerror = () => {
+    if (!opened) {
+      source.close();
+      onUnavailable();
+    }
+  };
+  Object.entries(handlers).forEach(([event, handler]) => {
+    source.addEventListener(event, (message) => handler(JSON.parse(message.data), event));
+  });
+  return () => source.close();
+};
+
+// Client-side equivalent of the API's sort_by parameter
+export const sortReceipts = (receipts, sortBy = '-transaction_date') => {
+  const descending = sortBy.startsWith('-');
+  const field = descending ? sortBy.slice(1) : sortBy;
+  const numeric = field === 'amount' || field === 'confidence_score';
+
+  return [...receipts].sort((a, b) => {
+    const left = numeric ? parseFloat(a[field]) : a[field];
+    const right = numeric ? parseFloat(b[field]) : b[field];
+    if (left === right) return 0;
+    const order = left < right ? -1 : 1;
+    return descending ? -order : order;
+  });
+};
+
 export default api;
\ No newline at end of file